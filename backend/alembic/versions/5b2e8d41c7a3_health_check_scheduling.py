@@ -0,0 +1,30 @@
+"""health check scheduling
+
+Revision ID: 5b2e8d41c7a3
+Revises: 3997c60d9cd7
+Create Date: 2026-10-19 09:12:31.408215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "5b2e8d41c7a3"
+down_revision: Union[str, None] = "3997c60d9cd7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("services", sa.Column("check_interval_seconds", sa.Integer(), nullable=True))
+    op.add_column("services", sa.Column("next_health_check_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("services", sa.Column("status_streak", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_services_next_health_check_at", "services", ["next_health_check_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_services_next_health_check_at", table_name="services")
+    op.drop_column("services", "status_streak")
+    op.drop_column("services", "next_health_check_at")
+    op.drop_column("services", "check_interval_seconds")
@@ -0,0 +1,28 @@
+"""unique vm per node
+
+Revision ID: 8c4f1a9e2d57
+Revises: 5b2e8d41c7a3
+Create Date: 2026-10-19 14:37:05.112930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "8c4f1a9e2d57"
+down_revision: Union[str, None] = "5b2e8d41c7a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the newest row (highest UUID7) of any duplicated (node_id, vmid) pair
+    op.execute(
+        "DELETE FROM vms a USING vms b "
+        "WHERE a.node_id = b.node_id AND a.vmid = b.vmid AND a.id < b.id"
+    )
+    op.create_unique_constraint("uq_vms_node_id_vmid", "vms", ["node_id", "vmid"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_vms_node_id_vmid", "vms", type_="unique")
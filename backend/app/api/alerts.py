@@ -3,11 +3,12 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_session
+from app.api.responses import model_response
+from app.dependencies import get_read_session, get_session
 from app.models.alert import Alert, AlertRule
 from app.schemas.alerts import (
     AlertListResponse,
@@ -25,33 +26,34 @@ router = APIRouter()
 @router.get("", response_model=AlertListResponse)
 async def list_alerts(
     status: str | None = None,
-    session: AsyncSession = Depends(get_session),
-) -> AlertListResponse:
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
     """List alerts, optionally filtered by status."""
     query = select(Alert).order_by(Alert.fired_at.desc())
     if status:
         query = query.where(Alert.status == status)
     result = await session.execute(query)
     alerts = list(result.scalars().all())
-    return AlertListResponse(
+    return model_response(AlertListResponse(
         data=[AlertResponse.model_validate(a) for a in alerts],
         meta=Meta(timestamp=datetime.now(timezone.utc), total=len(alerts)),
-    )
+    ))
 
 
 @router.get("/rules", response_model=AlertRuleListResponse)
 async def list_alert_rules(
+    # Primary, not a replica: the UI refetches this right after its own writes
     session: AsyncSession = Depends(get_session),
-) -> AlertRuleListResponse:
+) -> Response:
     """List all alert rules."""
     result = await session.execute(
         select(AlertRule).order_by(AlertRule.name)
     )
     rules = list(result.scalars().all())
-    return AlertRuleListResponse(
+    return model_response(AlertRuleListResponse(
         data=[AlertRuleResponse.model_validate(r) for r in rules],
         meta=Meta(timestamp=datetime.now(timezone.utc), total=len(rules)),
-    )
+    ))
 
 
 @router.post("/rules", response_model=dict, status_code=201)
@@ -1,14 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_session
+from app.api.responses import model_response
+from app.config import settings
+from app.dependencies import get_read_session, get_redis, get_session
 from app.models.vm import VM
 from app.schemas.infrastructure import (
+    BulkVMActionRequest,
+    JobDetailResponse,
+    JobResponse,
     Meta,
     NodeListResponse,
     NodeResponse,
@@ -17,9 +24,14 @@ from app.schemas.infrastructure import (
     VMResponse,
 )
 from app.services.infrastructure import InfrastructureService
+from app.services.jobs import TRACK_TASK, JobTracker, job_summary
+from app.services.proxmox import ProxmoxClient
+from app.websocket.events import event_publisher
 
 router = APIRouter()
 
+ACTION_STATUS = {"start": "starting", "stop": "stopping", "restart": "restarting"}
+
 
 async def _get_vm_or_404(
     service: InfrastructureService, vm_id: uuid.UUID
@@ -35,29 +47,29 @@ async def _get_vm_or_404(
 
 @router.get("/nodes", response_model=NodeListResponse)
 async def list_nodes(
-    session: AsyncSession = Depends(get_session),
-) -> NodeListResponse:
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
     """List all infrastructure nodes."""
     service = InfrastructureService(session)
     nodes = await service.get_nodes()
-    return NodeListResponse(
+    return model_response(NodeListResponse(
         data=[NodeResponse.model_validate(n) for n in nodes],
         meta=Meta(timestamp=datetime.now(timezone.utc), total=len(nodes)),
-    )
+    ))
 
 
 @router.get("/vms", response_model=VMListResponse)
 async def list_vms(
     node_id: uuid.UUID | None = None,
-    session: AsyncSession = Depends(get_session),
-) -> VMListResponse:
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
     """List all VMs, optionally filtered by node."""
     service = InfrastructureService(session)
     vms = await service.get_vms(node_id)
-    return VMListResponse(
+    return model_response(VMListResponse(
         data=[VMResponse.model_validate(vm) for vm in vms],
         meta=Meta(timestamp=datetime.now(timezone.utc), total=len(vms)),
-    )
+    ))
 
 
 @router.get("/vms/{vm_id}", response_model=dict)
@@ -91,58 +103,177 @@ async def get_vm_metrics(
     return VMMetricsResponse(**metrics)
 
 
-@router.post("/vms/{vm_id}/start")
-async def start_vm(
+async def _run_vm_action(
+    action: str,
     vm_id: uuid.UUID,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession,
+    redis: Redis,
 ) -> dict:
-    """Start a VM."""
+    """Submit a power action and track its Proxmox task as a job."""
     service = InfrastructureService(session)
     vm = await _get_vm_or_404(service, vm_id)
 
-    result = await service.start_vm(vm.node.proxmox_node_name, vm.vmid)
+    result = await _submit_action(service.proxmox, action, vm.node.proxmox_node_name, vm.vmid)
     if result is None:
-        raise HTTPException(status_code=503, detail="Failed to start VM")
+        raise HTTPException(status_code=503, detail=f"Failed to {action} VM")
 
-    from app.websocket.events import publish_event
+    tracker = JobTracker(redis)
+    job_id = await tracker.create_job(action, [vm])
+    await tracker.mark_submitted(job_id, vm.id, vm.vmid, result)
+    await _start_tracking(tracker)
 
-    publish_event("vm_action_complete", {"vm_id": str(vm_id), "vmid": vm.vmid, "action": "start"})
-    return {"data": {"status": "starting", "task": result}, "meta": {"timestamp": datetime.now(timezone.utc).isoformat()}}
+    event_publisher.publish("vm_action_progress", {
+        "job_id": job_id,
+        "vm_id": str(vm_id),
+        "vmid": vm.vmid,
+        "action": action,
+        "status": "running",
+    })
+    return {
+        "data": {"status": ACTION_STATUS[action], "task": result, "job_id": job_id},
+        "meta": {"timestamp": datetime.now(timezone.utc).isoformat()},
+    }
 
 
-@router.post("/vms/{vm_id}/stop")
-async def stop_vm(
+async def _submit_action(
+    proxmox: ProxmoxClient, action: str, node_name: str, vmid: int
+) -> str | None:
+    """Send a power action to Proxmox and return its task UPID, or None on failure."""
+    submit = {
+        "start": proxmox.start_vm,
+        "stop": proxmox.stop_vm,
+        "restart": proxmox.restart_vm,
+    }[action]
+    return await asyncio.to_thread(submit, node_name, vmid)
+
+
+async def _start_tracking(tracker: JobTracker) -> None:
+    """Make sure the tracker worker is polling for newly submitted tasks."""
+    token = await tracker.schedule_poll()
+    if token is not None:
+        from app.workers.celery_app import celery_app
+
+        await asyncio.to_thread(celery_app.send_task, TRACK_TASK, args=[token])
+
+
+@router.post("/vms/{vm_id}/start")
+async def start_vm(
     vm_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis),
 ) -> dict:
-    """Stop a VM."""
-    service = InfrastructureService(session)
-    vm = await _get_vm_or_404(service, vm_id)
-
-    result = await service.stop_vm(vm.node.proxmox_node_name, vm.vmid)
-    if result is None:
-        raise HTTPException(status_code=503, detail="Failed to stop VM")
+    """Start a VM. Completion is reported by the returned job."""
+    return await _run_vm_action("start", vm_id, session, redis)
 
-    from app.websocket.events import publish_event
 
-    publish_event("vm_action_complete", {"vm_id": str(vm_id), "vmid": vm.vmid, "action": "stop"})
-    return {"data": {"status": "stopping", "task": result}, "meta": {"timestamp": datetime.now(timezone.utc).isoformat()}}
+@router.post("/vms/{vm_id}/stop")
+async def stop_vm(
+    vm_id: uuid.UUID,
+    session: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis),
+) -> dict:
+    """Stop a VM. Completion is reported by the returned job."""
+    return await _run_vm_action("stop", vm_id, session, redis)
 
 
 @router.post("/vms/{vm_id}/restart")
 async def restart_vm(
     vm_id: uuid.UUID,
     session: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis),
+) -> dict:
+    """Restart a VM. Completion is reported by the returned job."""
+    return await _run_vm_action("restart", vm_id, session, redis)
+
+
+@router.post("/vms/actions", status_code=202)
+async def bulk_vm_action(
+    body: BulkVMActionRequest,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session),
+    redis: Redis = Depends(get_redis),
 ) -> dict:
-    """Restart a VM."""
+    """Apply a power action to many VMs at once.
+
+    VMs are resolved in a single query and submitted in the background, in
+    parallel with at most ``vm_action_node_concurrency`` actions per node.
+    Selections larger than ``vm_action_bulk_limit`` are rejected with 422.
+    Per-VM outcomes are reported through the returned job.
+    """
     service = InfrastructureService(session)
-    vm = await _get_vm_or_404(service, vm_id)
+    limit = settings.vm_action_bulk_limit
+    # One extra row tells an oversized selection apart from one at the limit
+    vms = await service.get_vms_by_selector(body.vm_ids, body.node_id, body.tag, limit=limit + 1)
+    if not vms:
+        raise HTTPException(status_code=404, detail="No VMs match the selection")
+    if len(vms) > limit:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Selection matches more than {limit} VMs; narrow it or split the job",
+        )
 
-    result = await service.restart_vm(vm.node.proxmox_node_name, vm.vmid)
-    if result is None:
-        raise HTTPException(status_code=503, detail="Failed to restart VM")
+    tracker = JobTracker(redis)
+    job_id = await tracker.create_job(body.action, vms)
+    # The task outlives the request's session, so it only gets plain VM data
+    targets = [
+        (vm.id, vm.vmid, vm.node.proxmox_node_name if vm.node else None) for vm in vms
+    ]
+    background_tasks.add_task(
+        _submit_bulk_action, service.proxmox, tracker, job_id, body.action, targets
+    )
+    return {
+        "data": {"job_id": job_id, "status": "running", "total": len(vms)},
+        "meta": {"timestamp": datetime.now(timezone.utc).isoformat()},
+    }
+
+
+async def _submit_bulk_action(
+    proxmox: ProxmoxClient,
+    tracker: JobTracker,
+    job_id: str,
+    action: str,
+    targets: list[tuple[uuid.UUID, int, str | None]],
+) -> None:
+    """Submit a bulk job's actions in parallel, bounded per node.
 
-    from app.websocket.events import publish_event
+    ``targets`` holds ``(vm_id, vmid, node_name)`` for each VM.
+    """
+    node_limits: dict[str, asyncio.Semaphore] = {}
 
-    publish_event("vm_action_complete", {"vm_id": str(vm_id), "vmid": vm.vmid, "action": "restart"})
-    return {"data": {"status": "restarting", "task": result}, "meta": {"timestamp": datetime.now(timezone.utc).isoformat()}}
+    async def submit_one(vm_id: uuid.UUID, vmid: int, node_name: str | None) -> None:
+        if not node_name:
+            await tracker.mark_submitted(job_id, vm_id, vmid, None, "VM has no associated node")
+            return
+        limit = node_limits.setdefault(
+            node_name, asyncio.Semaphore(settings.vm_action_node_concurrency)
+        )
+        async with limit:
+            try:
+                upid = await _submit_action(proxmox, action, node_name, vmid)
+            except Exception as exc:
+                await tracker.mark_submitted(job_id, vm_id, vmid, None, str(exc))
+                return
+        await tracker.mark_submitted(job_id, vm_id, vmid, upid)
+        if upid:
+            await _start_tracking(tracker)
+
+    await asyncio.gather(*(submit_one(*target) for target in targets))
+
+    job = await tracker.get_job(job_id)
+    if job is not None:
+        event_publisher.publish("job_update", job_summary(job))
+
+
+@router.get("/jobs/{job_id}", response_model=JobDetailResponse)
+async def get_job(
+    job_id: str,
+    redis: Redis = Depends(get_redis),
+) -> JobDetailResponse:
+    """Get the status of a VM action job and each VM's outcome."""
+    job = await JobTracker(redis).get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job with id '{job_id}' not found")
+    return JobDetailResponse(
+        data=JobResponse(**job),
+        meta=Meta(timestamp=datetime.now(timezone.utc), total=len(job["items"])),
+    )
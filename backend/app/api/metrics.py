@@ -1,21 +1,28 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
+import zlib
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.dependencies import get_session
+from app.api.responses import model_response
+from app.config import settings
+from app.dependencies import get_read_session, get_session
 from app.schemas.infrastructure import Meta
 from app.schemas.metrics import (
     MetricResponse,
+    MetricsIngestResponse,
+    MetricsIngestResult,
     MetricTimeSeries,
     MetricTimeSeriesPoint,
     MetricsOverviewResponse,
     MetricsTimeSeriesResponse,
     ResourceOverview,
 )
+from app.services.ingest import LineProtocolParser
 from app.services.metrics import MetricsService
 
 router = APIRouter()
@@ -23,7 +30,7 @@ router = APIRouter()
 
 @router.get("/overview", response_model=MetricsOverviewResponse)
 async def get_metrics_overview(
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ) -> MetricsOverviewResponse:
     """Get aggregate metrics overview across all infrastructure."""
     service = MetricsService(session)
@@ -34,12 +41,76 @@ async def get_metrics_overview(
     )
 
 
+async def _read_body(request: Request) -> str:
+    """Read a pushed batch, gunzipping if needed, within the size limit."""
+    limit = settings.metrics_ingest_max_bytes
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail="Metrics batch is too large")
+        chunks.append(chunk)
+    body = b"".join(chunks)
+
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        try:
+            body = decompressor.decompress(body, limit + 1)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip body") from None
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail="Metrics batch is too large")
+    try:
+        return body.decode()
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Metrics batch is not valid UTF-8") from None
+
+
+@router.post("/ingest", response_model=MetricsIngestResponse)
+async def ingest_metrics(
+    request: Request,
+    precision: str = Query("ns", pattern="^(ns|us|ms|s)$"),
+    session: AsyncSession = Depends(get_session),
+) -> Response:
+    """Ingest samples pushed by guest agents in InfluxDB line protocol.
+
+    Each line needs a ``source_id`` tag (or ``vmid`` for VMs) and may set
+    ``source_type`` (default ``vm``) and ``unit``. Lines that cannot be
+    parsed are rejected individually; the rest are written with ``COPY``.
+    """
+    text = await _read_body(request)
+    parser = LineProtocolParser(precision)
+    # Parsing is CPU bound; keep the event loop free for other requests
+    await asyncio.to_thread(parser.parse, text)
+
+    service = MetricsService(session)
+    if parser.by_vmid:
+        parser.resolve_vmids(await service.get_vm_ids_by_vmid(list(parser.by_vmid)))
+    if not parser.records and parser.rejected:
+        raise HTTPException(
+            status_code=400,
+            detail={"rejected": parser.rejected, "errors": parser.errors},
+        )
+    await service.copy_samples(parser.records)
+    await session.commit()
+
+    return model_response(MetricsIngestResponse(
+        data=MetricsIngestResult(
+            accepted=len(parser.records),
+            rejected=parser.rejected,
+            errors=parser.errors,
+        ),
+        meta=Meta(timestamp=datetime.now(timezone.utc)),
+    ))
+
+
 @router.get("/{source_id}", response_model=MetricsTimeSeriesResponse)
 async def get_metrics_for_source(
     source_id: uuid.UUID,
     range: str = Query("1h", pattern="^(1h|6h|24h|7d)$"),
-    session: AsyncSession = Depends(get_session),
-) -> MetricsTimeSeriesResponse:
+    session: AsyncSession = Depends(get_read_session),
+) -> Response:
     """Get time-series metrics for a specific source (node, VM, or service)."""
     service = MetricsService(session)
     metrics = await service.get_metrics_for_source(source_id, range)
@@ -56,7 +127,7 @@ async def get_metrics_for_source(
             MetricTimeSeriesPoint(value=metric.value, timestamp=metric.timestamp)
         )
 
-    return MetricsTimeSeriesResponse(
+    return model_response(MetricsTimeSeriesResponse(
         data=list(series_map.values()),
         meta=Meta(timestamp=datetime.now(timezone.utc), total=len(series_map)),
-    )
+    ))
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Serialize an already-built response model straight to JSON.
+
+    Returning a ``Response`` bypasses FastAPI's re-validation of the result
+    against ``response_model`` (kept on the route for the OpenAPI schema),
+    so hot list routes validate once and serialize once, in pydantic-core.
+    """
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json",
+    )
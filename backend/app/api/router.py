@@ -6,6 +6,7 @@ from app.api.infrastructure import router as infrastructure_router
 from app.api.services import router as services_router
 from app.api.metrics import router as metrics_router
 from app.api.alerts import router as alerts_router
+from app.api.tasks import router as tasks_router
 
 api_router = APIRouter()
 
@@ -29,3 +30,8 @@ api_router.include_router(
     prefix="/alerts",
     tags=["alerts"],
 )
+api_router.include_router(
+    tasks_router,
+    prefix="/tasks",
+    tags=["tasks"],
+)
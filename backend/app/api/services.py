@@ -3,10 +3,11 @@ from __future__ import annotations
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.responses import model_response
 from app.dependencies import get_session
 from app.models.service import Service
 from app.schemas.infrastructure import Meta
@@ -22,15 +23,16 @@ router = APIRouter()
 
 @router.get("", response_model=ServiceListResponse)
 async def list_services(
+    # Primary, not a replica: the UI refetches this right after its own writes
     session: AsyncSession = Depends(get_session),
-) -> ServiceListResponse:
+) -> Response:
     """List all registered services."""
     result = await session.execute(select(Service).order_by(Service.name))
     services = list(result.scalars().all())
-    return ServiceListResponse(
+    return model_response(ServiceListResponse(
         data=[ServiceResponse.model_validate(s) for s in services],
         meta=Meta(timestamp=datetime.now(timezone.utc), total=len(services)),
-    )
+    ))
 
 
 @router.get("/{service_id}", response_model=dict)
@@ -65,6 +67,7 @@ async def create_service(
         vm_id=body.vm_id,
         namespace=body.namespace,
         metadata_=body.metadata,
+        check_interval_seconds=body.check_interval_seconds,
     )
     session.add(service)
     await session.commit()
@@ -89,13 +92,17 @@ async def update_service(
     if not service:
         raise HTTPException(status_code=404, detail=f"Service with id '{service_id}' not found")
 
-    ALLOWED_FIELDS = {"name", "description", "type", "status", "health_check_url", "vm_id", "namespace", "metadata_"}
+    ALLOWED_FIELDS = {"name", "description", "type", "status", "health_check_url", "vm_id", "namespace", "metadata_", "check_interval_seconds"}
     update_data = body.model_dump(exclude_unset=True)
     if "metadata" in update_data:
         update_data["metadata_"] = update_data.pop("metadata")
     for key, value in update_data.items():
         if key in ALLOWED_FIELDS:
             setattr(service, key, value)
+    if {"health_check_url", "check_interval_seconds"} & update_data.keys():
+        # Re-check promptly on the next sweep with a fresh backoff
+        service.next_health_check_at = None
+        service.status_streak = 0
 
     await session.commit()
     await session.refresh(service)
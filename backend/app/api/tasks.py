@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from redis import RedisError
+
+from app.api.responses import model_response
+from app.schemas.infrastructure import Meta
+from app.schemas.tasks import TaskRunListResponse, TaskRunResponse
+from app.workers.telemetry import read_task_runs
+
+router = APIRouter()
+
+
+@router.get("/runs", response_model=TaskRunListResponse)
+async def list_task_runs(
+    task: str | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> Response:
+    """List recent background task runs, optionally filtered by task name."""
+    try:
+        runs = await asyncio.to_thread(read_task_runs, task, limit)
+    except RedisError:
+        raise HTTPException(status_code=503, detail="Task telemetry is unavailable")
+    return model_response(TaskRunListResponse(
+        data=[TaskRunResponse(**run) for run in runs],
+        meta=Meta(timestamp=datetime.now(timezone.utc), total=len(runs)),
+    ))
@@ -1,26 +1,129 @@
 from __future__ import annotations
 
+import itertools
+from collections.abc import Iterator
+from typing import Any
+
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
 from app.config import settings
+from app.instrumentation import instrument_engine
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.environment == "development",
-    pool_size=20,
-    max_overflow=0,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
+DATABASE_ROLES = ("api", "worker", "export")
 
-async_session_maker = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+
+def _engine_options(role: str) -> dict[str, Any]:
+    """Pool size, overflow, statement timeout and statement cache for a workload role."""
+    if role not in DATABASE_ROLES:
+        raise ValueError(f"Unknown database role {role!r}")
+    cache_size = getattr(settings, f"db_{role}_statement_cache_size")
+    connect_args: dict[str, Any] = {
+        # SQLAlchemy's asyncpg adapter cache and asyncpg's own cache
+        "prepared_statement_cache_size": cache_size,
+        "statement_cache_size": cache_size,
+    }
+    timeout_ms = getattr(settings, f"db_{role}_statement_timeout_ms")
+    if timeout_ms:
+        connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+    return {
+        "pool_size": getattr(settings, f"db_{role}_pool_size"),
+        "max_overflow": getattr(settings, f"db_{role}_max_overflow"),
+        "connect_args": connect_args,
+    }
+
+
+def _create_engine(url: str, role: str) -> AsyncEngine:
+    db_engine = create_async_engine(
+        url,
+        echo=settings.environment == "development",
+        pool_pre_ping=True,
+        pool_recycle=3600,
+        **_engine_options(role),
+    )
+    instrument_engine(db_engine, role)
+    return db_engine
+
+
+def _create_session_maker(bind: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+current_role: str
+engine: AsyncEngine
+async_session_maker: async_sessionmaker[AsyncSession]
+replica_engines: list[AsyncEngine]
+_read_session_makers: Iterator[async_sessionmaker[AsyncSession]]
+_role_engines: dict[str, AsyncEngine] = {}
+
+
+def configure(role: str) -> None:
+    """(Re)build this process's engines with the pool settings for ``role``.
+
+    Runs at import for ``settings.database_role``; Celery worker processes
+    switch to the ``worker`` role on start. Callers must dispose the
+    previous engines first.
+    """
+    global current_role, engine, async_session_maker, replica_engines, _read_session_makers
+
+    current_role = role
+    engine = _create_engine(settings.database_url, role)
+    async_session_maker = _create_session_maker(engine)
+    # Read replicas each get their own pool, so dashboard reads never take
+    # connections from writers on the primary.
+    replica_engines = [_create_engine(url, role) for url in settings.database_replica_urls]
+    _read_session_makers = itertools.cycle(
+        [_create_session_maker(replica) for replica in replica_engines]
+        or [async_session_maker]
+    )
+    _role_engines.clear()
+    _role_engines[role] = engine
+
+
+def read_session_maker() -> async_sessionmaker[AsyncSession]:
+    """Return the session factory for the next replica (round robin), or the primary."""
+    return next(_read_session_makers)
+
+
+def role_session_maker(role: str) -> async_sessionmaker[AsyncSession]:
+    """Return a session factory on a primary pool dedicated to ``role``.
+
+    For work sharing a process with another role, e.g. a long export from
+    the API, which must not hold API connections or inherit its timeout.
+    """
+    role_engine = _role_engines.get(role)
+    if role_engine is None:
+        role_engine = _role_engines[role] = _create_engine(settings.database_url, role)
+    return _create_session_maker(role_engine)
+
+
+def engines_by_role() -> list[tuple[str, str, AsyncEngine]]:
+    """Return ``(role, pool, engine)`` for every engine, naming each pool."""
+    engines = [(current_role, "primary", engine)]
+    engines += [
+        (current_role, f"replica{i}", replica) for i, replica in enumerate(replica_engines)
+    ]
+    engines += [
+        (other_role, "primary", other)
+        for other_role, other in _role_engines.items()
+        if other is not engine
+    ]
+    return engines
+
+
+def all_engines() -> list[AsyncEngine]:
+    """Return every engine this process has created."""
+    return list({id(e): e for e in (engine, *replica_engines, *_role_engines.values())}.values())
+
+
+configure(settings.database_role)
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from collections.abc import AsyncGenerator
 
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session_maker
+from app.config import settings
+from app.database import async_session_maker, read_session_maker
+
+_redis: Redis | None = None
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
@@ -14,3 +18,32 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Provide a session on a read replica (or the primary if none is configured).
+
+    For read-only list, metrics and overview routes that tolerate replication
+    lag. Writes, and reads that must see them immediately, use ``get_session``.
+    """
+    async with read_session_maker()() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+async def get_redis() -> Redis:
+    """Provide the app's shared async Redis client for dependency injection."""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client on shutdown."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, TypeVar
+
+import redis
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Histogram, generate_latest
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    SummaryMetricFamily,
+)
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.workers.runtime import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Worker processes are not scraped; they fold their Proxmox call timings into
+# this Redis hash after each task and the API exposes them.
+PROXMOX_CALLS_KEY = "nexops:metrics:proxmox_calls"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "nexops_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_DURATION = Histogram(
+    "nexops_db_query_duration_seconds",
+    "Database statement execution time",
+    ["role"],
+    buckets=LATENCY_BUCKETS,
+)
+PROXMOX_REQUEST_DURATION = Histogram(
+    "nexops_proxmox_request_duration_seconds",
+    "Proxmox API call latency in this process",
+    ["endpoint", "node"],
+    buckets=LATENCY_BUCKETS,
+)
+WS_FRAMES_DROPPED = Counter(
+    "nexops_websocket_frames_dropped_total",
+    "Frames dropped from full WebSocket send queues",
+)
+WS_SLOW_DISCONNECTS = Counter(
+    "nexops_websocket_slow_disconnects_total",
+    "WebSocket clients disconnected for falling too far behind",
+)
+
+# (endpoint, node) -> [calls, seconds] not yet flushed to Redis (workers only)
+_pending_proxmox_calls: dict[tuple[str, str], list[float]] = {}
+_pending_lock = threading.Lock()
+
+
+class PrometheusMiddleware:
+    """ASGI middleware timing HTTP requests by method, route template and status.
+
+    Labels use the matched route's path template, never the raw URL, so the
+    series count stays bounded. WebSocket and lifespan traffic pass through.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status)
+            ).observe(time.perf_counter() - started)
+
+
+def instrument_proxmox(endpoint: str) -> Callable[[F], F]:
+    """Time a ``ProxmoxClient`` method whose first argument is the node name."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            node = str(args[0]) if args else ""
+            started = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                PROXMOX_REQUEST_DURATION.labels(endpoint, node).observe(elapsed)
+                with _pending_lock:
+                    totals = _pending_proxmox_calls.setdefault((endpoint, node), [0, 0.0])
+                    totals[0] += 1
+                    totals[1] += elapsed
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def flush_proxmox_calls(client: redis.Redis) -> None:
+    """Add this process's unflushed Proxmox call totals to the shared Redis hash."""
+    with _pending_lock:
+        pending = dict(_pending_proxmox_calls)
+        _pending_proxmox_calls.clear()
+    if not pending:
+        return
+    pipe = client.pipeline(transaction=False)
+    for (endpoint, node), (calls, seconds) in pending.items():
+        pipe.hincrby(PROXMOX_CALLS_KEY, f"{endpoint}|{node}|count", int(calls))
+        pipe.hincrbyfloat(PROXMOX_CALLS_KEY, f"{endpoint}|{node}|sum", seconds)
+    pipe.execute()
+
+
+def instrument_engine(engine: AsyncEngine, role: str) -> None:
+    """Time every statement run on ``engine``."""
+    sync_engine = engine.sync_engine
+    histogram = DB_QUERY_DURATION.labels(role)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn: Any, *_args: Any) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn: Any, *_args: Any) -> None:
+        histogram.observe(time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context: Any) -> None:
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
+
+
+class StateCollector(Collector):
+    """Reads pool, WebSocket and Celery state at scrape time.
+
+    Nothing here runs on the request path: each value is read only when
+    Prometheus scrapes ``/metrics``.
+    """
+
+    def describe(self) -> list[Any]:
+        # Without this the registry calls collect() at registration time
+        return []
+
+    def collect(self) -> Iterator[Any]:
+        yield from self._collect_pools()
+        yield from self._collect_websockets()
+        try:
+            yield from self._collect_celery()
+            yield from self._collect_worker_proxmox()
+        except redis.RedisError:
+            logger.warning("Failed to read worker metrics from Redis", exc_info=True)
+
+    def _collect_pools(self) -> Iterator[Any]:
+        from app import database
+
+        checked_out = GaugeMetricFamily(
+            "nexops_db_pool_checked_out", "Connections in use", labels=["role", "pool"]
+        )
+        size = GaugeMetricFamily(
+            "nexops_db_pool_size", "Configured pool size", labels=["role", "pool"]
+        )
+        overflow = GaugeMetricFamily(
+            "nexops_db_pool_overflow", "Overflow connections open", labels=["role", "pool"]
+        )
+        for role, pool_name, engine in database.engines_by_role():
+            pool = engine.sync_engine.pool
+            labels = [role, pool_name]
+            checked_out.add_metric(labels, pool.checkedout())
+            size.add_metric(labels, pool.size())
+            overflow.add_metric(labels, max(pool.overflow(), 0))
+        yield checked_out
+        yield size
+        yield overflow
+
+    def _collect_websockets(self) -> Iterator[Any]:
+        from app.websocket.manager import ws_manager
+
+        stats = ws_manager.stats()
+        yield GaugeMetricFamily(
+            "nexops_websocket_connections", "Connected WebSocket clients", value=stats["connections"]
+        )
+        yield GaugeMetricFamily(
+            "nexops_websocket_queued_frames",
+            "Frames waiting in all client send queues",
+            value=stats["queued_frames"],
+        )
+        yield GaugeMetricFamily(
+            "nexops_websocket_max_queue_depth",
+            "Deepest client send queue",
+            value=stats["max_queue_depth"],
+        )
+        yield GaugeMetricFamily(
+            "nexops_websocket_pending_events",
+            "Events buffered for the next coalesced batch",
+            value=stats["pending_events"],
+        )
+
+    def _collect_celery(self) -> Iterator[Any]:
+        from app.workers.single_flight import TICK_COUNTS_KEY
+        from app.workers.telemetry import TASK_DURATIONS_KEY
+
+        client = get_sync_redis()
+        pipe = client.pipeline(transaction=False)
+        pipe.hgetall(TICK_COUNTS_KEY)
+        pipe.hgetall(TASK_DURATIONS_KEY)
+        tick_counts, durations = pipe.execute()
+
+        ticks = CounterMetricFamily(
+            "nexops_celery_ticks", "Task ticks by outcome", labels=["task", "outcome"]
+        )
+        for field, value in tick_counts.items():
+            task_name, _, outcome = field.rpartition(":")
+            ticks.add_metric([task_name, outcome], int(value))
+        yield ticks
+
+        totals: dict[str, dict[str, float]] = {}
+        for field, value in durations.items():
+            task_name, _, kind = field.rpartition(":")
+            totals.setdefault(task_name, {})[kind] = float(value)
+        summary = SummaryMetricFamily(
+            "nexops_celery_task_duration_seconds", "Celery task run time", labels=["task"]
+        )
+        for task_name, total in totals.items():
+            summary.add_metric([task_name], total.get("count", 0), total.get("sum", 0.0))
+        yield summary
+
+    def _collect_worker_proxmox(self) -> Iterator[Any]:
+        calls = get_sync_redis().hgetall(PROXMOX_CALLS_KEY)
+        totals: dict[tuple[str, str], dict[str, float]] = {}
+        for field, value in calls.items():
+            endpoint, node, kind = field.rsplit("|", 2)
+            totals.setdefault((endpoint, node), {})[kind] = float(value)
+        summary = SummaryMetricFamily(
+            "nexops_worker_proxmox_request_duration_seconds",
+            "Proxmox API call latency in Celery workers",
+            labels=["endpoint", "node"],
+        )
+        for (endpoint, node), total in totals.items():
+            summary.add_metric([endpoint, node], total.get("count", 0), total.get("sum", 0.0))
+        yield summary
+
+
+def register_state_collector() -> None:
+    """Register the scrape-time collector with the default registry (API only)."""
+    REGISTRY.register(StateCollector())
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the registry in Prometheus text format and its content type."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
 from app.config import settings
+from app.dependencies import close_redis
+from app.instrumentation import PrometheusMiddleware, register_state_collector, render_metrics
 from app.websocket.endpoint import router as ws_router
+from app.websocket.events import event_publisher
 from app.websocket.manager import ws_manager
 
 logging.basicConfig(
@@ -20,10 +25,13 @@ logging.basicConfig(
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
-    """Startup/shutdown lifecycle for the WebSocket manager."""
+    """Startup/shutdown lifecycle for the event publisher and WebSocket manager."""
+    await event_publisher.startup()
     await ws_manager.startup()
     yield
     await ws_manager.shutdown()
+    await event_publisher.shutdown()
+    await close_redis()
 
 
 app = FastAPI(
@@ -31,8 +39,12 @@ app = FastAPI(
     description="Infrastructure management platform",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+register_state_collector()
+
+app.add_middleware(PrometheusMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
@@ -49,3 +61,11 @@ app.include_router(ws_router)
 async def health_check() -> dict[str, str]:
     """Health check endpoint."""
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics() -> Response:
+    """Expose NexOps' own instrumentation in Prometheus text format."""
+    # Rendering reads worker totals from Redis; keep it off the event loop
+    body, content_type = await asyncio.to_thread(render_metrics)
+    return Response(content=body, media_type=content_type)
@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -42,5 +42,12 @@ class Service(Base, TimestampMixin):
     last_health_check: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    check_interval_seconds: Mapped[int | None] = mapped_column(
+        Integer, nullable=True
+    )
+    next_health_check_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True
+    )
+    status_streak: Mapped[int] = mapped_column(Integer, default=0)
 
     vm: Mapped[VM | None] = relationship(back_populates="services")
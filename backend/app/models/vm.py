@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Float, ForeignKey, Integer, String
+from sqlalchemy import Float, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -18,6 +18,9 @@ class VM(Base, TimestampMixin):
     """Represents a virtual machine or container managed by a node."""
 
     __tablename__ = "vms"
+    __table_args__ = (
+        UniqueConstraint("node_id", "vmid", name="uq_vms_node_id_vmid"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         primary_key=True,
@@ -46,5 +49,5 @@ class VM(Base, TimestampMixin):
 
     node: Mapped[Node] = relationship(back_populates="vms")
     services: Mapped[list[Service]] = relationship(
-        back_populates="vm", cascade="all, delete-orphan"
+        back_populates="vm", passive_deletes=True
     )
@@ -3,8 +3,9 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 from typing import Literal
+from urllib.parse import urlparse
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 from app.schemas.infrastructure import Meta
 
@@ -12,6 +13,17 @@ VALID_CONDITIONS = Literal["gt", "lt", "gte", "lte", "eq"]
 VALID_SEVERITIES = Literal["info", "warning", "critical"]
 
 
+def _validate_notification_channels(channels: list[str] | None) -> list[str] | None:
+    """Validate that every notification channel is an http(s) webhook URL."""
+    if channels is None:
+        return None
+    for channel in channels:
+        parsed = urlparse(channel)
+        if parsed.scheme not in {"http", "https"} or not parsed.hostname:
+            raise ValueError("notification_channels must be http or https webhook URLs")
+    return channels
+
+
 class AlertRuleCreate(BaseModel):
     """Schema for creating an alert rule."""
 
@@ -25,6 +37,11 @@ class AlertRuleCreate(BaseModel):
     enabled: bool = True
     notification_channels: list[str] | None = None
 
+    @field_validator("notification_channels")
+    @classmethod
+    def validate_channels(cls, v: list[str] | None) -> list[str] | None:
+        return _validate_notification_channels(v)
+
 
 class AlertRuleUpdate(BaseModel):
     """Schema for updating an alert rule."""
@@ -39,6 +56,11 @@ class AlertRuleUpdate(BaseModel):
     enabled: bool | None = None
     notification_channels: list[str] | None = None
 
+    @field_validator("notification_channels")
+    @classmethod
+    def validate_channels(cls, v: list[str] | None) -> list[str] | None:
+        return _validate_notification_channels(v)
+
 
 class AlertRuleResponse(BaseModel):
     """Schema for an alert rule in API responses."""
@@ -2,8 +2,13 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from app.config import settings
+
+VALID_VM_ACTIONS = Literal["start", "stop", "restart"]
 
 
 class Meta(BaseModel):
@@ -81,3 +86,54 @@ class VMMetricsResponse(BaseModel):
     network_in: float
     network_out: float
     uptime: int
+
+
+class BulkVMActionRequest(BaseModel):
+    """Power action applied to VMs picked by id, node or tag.
+
+    Selectors combine: ``node_id`` and ``tag`` narrow ``vm_ids`` when given
+    together.
+    """
+
+    action: VALID_VM_ACTIONS
+    vm_ids: list[uuid.UUID] | None = None
+    node_id: uuid.UUID | None = None
+    tag: str | None = None
+
+    @model_validator(mode="after")
+    def require_selector(self) -> BulkVMActionRequest:
+        if not self.vm_ids and self.node_id is None and not self.tag:
+            raise ValueError("Provide vm_ids, node_id or tag to select VMs")
+        if self.vm_ids and len(self.vm_ids) > settings.vm_action_bulk_limit:
+            raise ValueError(f"At most {settings.vm_action_bulk_limit} vm_ids are allowed")
+        return self
+
+
+class JobItemResponse(BaseModel):
+    """Outcome of a VM action job for one VM."""
+
+    vm_id: uuid.UUID
+    vmid: int
+    name: str
+    node: str | None = None
+    status: str
+    upid: str | None = None
+    error: str | None = None
+    finished_at: datetime | None = None
+
+
+class JobResponse(BaseModel):
+    """A VM action job and the per-VM Proxmox task outcomes behind it."""
+
+    id: str
+    action: str
+    status: str
+    created_at: datetime
+    items: list[JobItemResponse]
+
+
+class JobDetailResponse(BaseModel):
+    """Single job wrapper."""
+
+    data: JobResponse
+    meta: Meta
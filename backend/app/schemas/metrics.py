@@ -61,3 +61,18 @@ class MetricsOverviewResponse(BaseModel):
 
     data: ResourceOverview
     meta: Meta
+
+
+class MetricsIngestResult(BaseModel):
+    """Outcome of a pushed metrics batch."""
+
+    accepted: int
+    rejected: int
+    errors: list[str]
+
+
+class MetricsIngestResponse(BaseModel):
+    """Pushed metrics ingestion response."""
+
+    data: MetricsIngestResult
+    meta: Meta
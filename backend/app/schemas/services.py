@@ -5,7 +5,7 @@ import uuid
 from datetime import datetime
 from urllib.parse import urlparse
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 
 from app.schemas.infrastructure import Meta
 
@@ -46,6 +46,7 @@ class ServiceCreate(BaseModel):
     vm_id: uuid.UUID | None = None
     namespace: str | None = None
     metadata: dict | None = None
+    check_interval_seconds: int | None = Field(default=None, ge=10)
 
     @field_validator("health_check_url")
     @classmethod
@@ -64,6 +65,7 @@ class ServiceUpdate(BaseModel):
     vm_id: uuid.UUID | None = None
     namespace: str | None = None
     metadata: dict | None = None
+    check_interval_seconds: int | None = Field(default=None, ge=10)
 
     @field_validator("health_check_url")
     @classmethod
@@ -84,6 +86,8 @@ class ServiceResponse(BaseModel):
     namespace: str | None = None
     metadata: dict | None = None
     last_health_check: datetime | None = None
+    check_interval_seconds: int | None = None
+    next_health_check_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+from app.schemas.infrastructure import Meta
+
+
+class TaskRunResponse(BaseModel):
+    """A single background task run recorded by the worker telemetry."""
+
+    id: str
+    task: str
+    outcome: str
+    duration_ms: float
+    items: dict[str, int]
+    finished_at: datetime
+
+
+class TaskRunListResponse(BaseModel):
+    """Most recent background task runs, newest first."""
+
+    data: list[TaskRunResponse]
+    meta: Meta
@@ -5,9 +5,10 @@ import logging
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import Integer, all_, bindparam, delete, func, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.models.node import Node
 from app.models.vm import VM
@@ -18,6 +19,9 @@ logger = logging.getLogger(__name__)
 REDIS_VM_LIST_TTL = 300  # 5 minutes
 REDIS_METRICS_TTL = 30   # 30 seconds
 
+# VM columns owned by Proxmox and rewritten by sync
+VM_SYNC_COLUMNS = ("name", "status", "type", "cpu_cores", "memory_mb", "disk_gb", "tags", "config")
+
 
 class InfrastructureService:
     """Business logic for infrastructure management."""
@@ -56,6 +60,25 @@ class InfrastructureService:
         )
         return result.scalar_one_or_none()
 
+    async def get_vms_by_selector(
+        self,
+        vm_ids: list[uuid.UUID] | None = None,
+        node_id: uuid.UUID | None = None,
+        tag: str | None = None,
+        limit: int | None = None,
+    ) -> list[VM]:
+        """Resolve VMs and their nodes in one query from ids, a node and/or a tag."""
+        query = select(VM).options(joinedload(VM.node))
+        if vm_ids:
+            query = query.where(VM.id.in_(vm_ids))
+        if node_id:
+            query = query.where(VM.node_id == node_id)
+        if tag:
+            query = query.where(VM.tags.contains([tag]))
+        query = query.order_by(VM.vmid).limit(limit)
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
     async def get_vm_metrics(self, node_name: str, vmid: int) -> dict:
         """Fetch current metrics for a VM from Proxmox (non-blocking)."""
         status = await asyncio.to_thread(self.proxmox.get_vm_status, node_name, vmid)
@@ -89,10 +112,15 @@ class InfrastructureService:
         """Restart a VM via Proxmox API (non-blocking)."""
         return await asyncio.to_thread(self.proxmox.restart_vm, node_name, vmid)
 
-    async def sync_nodes_and_vms(self) -> None:
-        """Pull latest node/VM data from Proxmox and update the database."""
+    async def sync_nodes_and_vms(self) -> dict[str, list[dict]]:
+        """Pull latest node/VM data from Proxmox and update the database.
+
+        Returns the VM changes the sync applied, as ``added``, ``removed`` and
+        ``changed`` lists (changed entries carry only the fields that changed).
+        """
         nodes_data = await asyncio.to_thread(self.proxmox.get_nodes)
         now = datetime.now(timezone.utc)
+        changes: dict[str, list[dict]] = {"added": [], "removed": [], "changed": []}
 
         for node_data in nodes_data:
             node_name = node_data.get("node", "")
@@ -162,10 +190,18 @@ class InfrastructureService:
                 for key, value in node_values.items():
                     setattr(node, key, value)
 
-            await self._sync_vms_for_node(node, node_name)
+            node_changes = await self._sync_vms_for_node(node, node_name)
+            for kind, entries in node_changes.items():
+                changes[kind].extend(entries)
 
         await self.session.commit()
-        logger.info("Infrastructure sync complete")
+        logger.info(
+            "Infrastructure sync complete (%d added, %d removed, %d changed VMs)",
+            len(changes["added"]),
+            len(changes["removed"]),
+            len(changes["changed"]),
+        )
+        return changes
 
     def _build_vm_values(
         self,
@@ -190,41 +226,90 @@ class InfrastructureService:
             "config": config if config else None,
         }
 
-    async def _sync_vms_for_node(self, node: Node, node_name: str) -> None:
-        """Sync VMs for a specific node."""
+    async def _sync_vms_for_node(self, node: Node, node_name: str) -> dict[str, list[dict]]:
+        """Sync VMs for a specific node with set-based statements.
+
+        One upsert writes every guest (rows whose values are unchanged are
+        skipped by the ``IS DISTINCT FROM`` guard) and one delete removes
+        guests no longer reported, however many guests the node has. Both
+        return the rows they touched, which are diffed against a snapshot
+        taken beforehand to report what changed.
+        """
         qemu_vms = await asyncio.to_thread(self.proxmox.get_vms, node_name)
         lxc_containers = await asyncio.to_thread(self.proxmox.get_containers, node_name)
 
-        existing_result = await self.session.execute(
-            select(VM).where(VM.node_id == node.id)
-        )
-        existing_vms = {vm.vmid: vm for vm in existing_result.scalars().all()}
-
-        seen_vmids: set[int] = set()
-
+        rows: dict[int, dict] = {}
         for vm_data in qemu_vms:
             vmid = vm_data.get("vmid", 0)
-            seen_vmids.add(vmid)
             config = await asyncio.to_thread(self.proxmox.get_vm_config, node_name, vmid)
-            vm_values = self._build_vm_values(node, vm_data, "qemu", config)
-
-            if vmid in existing_vms:
-                for key, value in vm_values.items():
-                    setattr(existing_vms[vmid], key, value)
-            else:
-                self.session.add(VM(**vm_values))
-
+            rows[vmid] = self._build_vm_values(node, vm_data, "qemu", config)
         for vm_data in lxc_containers:
-            vmid = vm_data.get("vmid", 0)
-            seen_vmids.add(vmid)
-            vm_values = self._build_vm_values(node, vm_data, "lxc")
+            rows[vm_data.get("vmid", 0)] = self._build_vm_values(node, vm_data, "lxc")
 
-            if vmid in existing_vms:
-                for key, value in vm_values.items():
-                    setattr(existing_vms[vmid], key, value)
-            else:
-                self.session.add(VM(**vm_values))
-
-        for vmid, vm in existing_vms.items():
-            if vmid not in seen_vmids:
-                await self.session.delete(vm)
+        snapshot_result = await self.session.execute(
+            select(VM.vmid, *(getattr(VM, column) for column in VM_SYNC_COLUMNS))
+            .where(VM.node_id == node.id)
+        )
+        before = {row.vmid: row for row in snapshot_result}
+        changes: dict[str, list[dict]] = {"added": [], "removed": [], "changed": []}
+
+        if rows:
+            stmt = pg_insert(VM)
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_vms_node_id_vmid",
+                set_={
+                    **{column: stmt.excluded[column] for column in VM_SYNC_COLUMNS},
+                    "updated_at": func.now(),
+                },
+                where=or_(*(
+                    getattr(VM, column).is_distinct_from(stmt.excluded[column])
+                    for column in VM_SYNC_COLUMNS
+                )),
+            ).returning(VM)
+            written = await self.session.scalars(stmt, list(rows.values()))
+            for vm in written:
+                previous = before.get(vm.vmid)
+                if previous is None:
+                    changes["added"].append(_vm_payload(vm))
+                    continue
+                changed_fields = {
+                    column: getattr(vm, column)
+                    for column in VM_SYNC_COLUMNS
+                    if getattr(previous, column) != getattr(vm, column)
+                }
+                changes["changed"].append({
+                    "id": str(vm.id),
+                    "node_id": str(vm.node_id),
+                    "vmid": vm.vmid,
+                    "changes": changed_fields,
+                    "updated_at": vm.updated_at.isoformat(),
+                })
+
+        removed = await self.session.execute(
+            delete(VM)
+            .where(
+                VM.node_id == node.id,
+                VM.vmid != all_(bindparam("seen_vmids", list(rows), type_=ARRAY(Integer))),
+            )
+            .returning(VM.id, VM.vmid)
+            .execution_options(synchronize_session=False)
+        )
+        changes["removed"] = [
+            {"id": str(vm_id), "node_id": str(node.id), "vmid": vmid}
+            for vm_id, vmid in removed
+        ]
+        return changes
+
+
+def _vm_payload(vm: VM) -> dict:
+    """Serialize a VM as published in change events (same shape as the API)."""
+    return {
+        "id": str(vm.id),
+        "node_id": str(vm.node_id),
+        "vmid": vm.vmid,
+        **{column: getattr(vm, column) for column in VM_SYNC_COLUMNS},
+        "ip_address": vm.ip_address,
+        "os_type": vm.os_type,
+        "created_at": vm.created_at.isoformat(),
+        "updated_at": vm.updated_at.isoformat(),
+    }
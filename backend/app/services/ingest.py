@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import math
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from app.models.base import generate_uuid7
+
+# Line protocol (as pushed by Telegraf and most node_exporter-style agents):
+#
+#   <measurement>,source_type=vm,source_id=<uuid>[,unit=<unit>] <field>=<value>[,...] [<timestamp>]
+#
+# VMs may be identified by their Proxmox ``vmid`` tag instead of ``source_id``.
+# Each numeric field becomes one sample named ``<measurement>_<field>``, or
+# just ``<measurement>`` for a field called ``value``.
+
+SOURCE_TYPES = frozenset({"node", "vm", "service"})
+PRECISION_DIVISORS = {"ns": 1_000_000_000, "us": 1_000_000, "ms": 1_000, "s": 1}
+MAX_REPORTED_ERRORS = 20
+
+# Column order of the records handed to COPY
+COPY_COLUMNS = ("id", "source_type", "source_id", "metric_name", "value", "unit", "timestamp")
+
+_METRIC_NAME_MAX = 100
+_UNIT_MAX = 20
+_BOOLEANS = {"t": 1.0, "T": 1.0, "true": 1.0, "True": 1.0, "TRUE": 1.0,
+             "f": 0.0, "F": 0.0, "false": 0.0, "False": 0.0, "FALSE": 0.0}
+
+
+class LineProtocolError(ValueError):
+    """A line that cannot be turned into samples."""
+
+
+# A run of characters up to an unescaped separator, keeping quoted strings whole
+_TOKEN_PATTERNS = {
+    sep: re.compile(rf'(?:\\.|"(?:\\.|[^"\\])*"|[^{sep}\\"])+')
+    for sep in " ,="
+}
+
+
+def _split(text: str, sep: str) -> list[str]:
+    """Split on ``sep`` outside double quotes and backslash escapes, keeping the escapes."""
+    return _TOKEN_PATTERNS[sep].findall(text)
+
+
+def _unescape(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text)
+
+
+def _field_value(raw: str) -> float | None:
+    """Return a numeric field value, or None for string fields (skipped)."""
+    if raw[-1] in "iu":
+        return float(int(raw[:-1]))
+    if raw[0] == '"':
+        return None
+    boolean = _BOOLEANS.get(raw)
+    if boolean is not None:
+        return boolean
+    value = float(raw)
+    if not math.isfinite(value):
+        raise LineProtocolError(f"field value {raw} is not finite")
+    return value
+
+
+class LineProtocolParser:
+    """Turns a line protocol batch into ``COPY`` records for the metrics table.
+
+    Lines without escapes or quoted strings (nearly all agent output) take a
+    ``str.split`` fast path. Source ids and timestamps repeat heavily within
+    a batch and are converted once each. Samples for VMs tagged by Proxmox
+    ``vmid`` are returned separately until the caller resolves their ids.
+    """
+
+    def __init__(self, precision: str = "ns", now: datetime | None = None) -> None:
+        self.divisor = PRECISION_DIVISORS[precision]
+        self.now = now or datetime.now(timezone.utc)
+        self.records: list[tuple[Any, ...]] = []
+        self.by_vmid: dict[int, list[tuple[Any, ...]]] = {}
+        self.rejected = 0
+        self.errors: list[str] = []
+        self._source_ids: dict[str, uuid.UUID] = {}
+        self._timestamps: dict[str, datetime] = {}
+
+    def parse(self, text: str) -> None:
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.strip()
+            if not line or line[0] == "#":
+                continue
+            try:
+                self._parse_line(line)
+            except LineProtocolError as exc:
+                self._reject(f"line {number}: {exc}")
+            except (ValueError, IndexError):
+                self._reject(f"line {number}: malformed")
+
+    def _reject(self, error: str, count: int = 1) -> None:
+        self.rejected += count
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(error)
+
+    @property
+    def accepted(self) -> int:
+        return len(self.records) + sum(len(samples) for samples in self.by_vmid.values())
+
+    def _parse_line(self, line: str) -> None:
+        if "\\" in line or '"' in line:
+            sections = _split(line, " ")
+            series = [_unescape(part) for part in _split(sections[0], ",")]
+            fields = [
+                (_unescape(name), raw)
+                for name, raw in (_split(field, "=")[:2] for field in _split(sections[1], ","))
+            ]
+        else:
+            sections = line.split()
+            series = sections[0].split(",")
+            fields = [field.split("=", 1) for field in sections[1].split(",")]
+        if len(sections) > 3:
+            raise LineProtocolError("unexpected text after timestamp")
+
+        measurement = series[0]
+        tags = dict(tag.split("=", 1) for tag in series[1:])
+        source_type = tags.get("source_type", "vm")
+        if source_type not in SOURCE_TYPES:
+            raise LineProtocolError(f"unknown source_type {source_type!r}")
+        unit = tags.get("unit", "")
+        if len(unit) > _UNIT_MAX:
+            raise LineProtocolError("unit is too long")
+        timestamp = self._timestamp(sections[2]) if len(sections) == 3 else self.now
+
+        samples = []
+        for name, raw in fields:
+            value = _field_value(raw)
+            if value is None:
+                continue
+            metric_name = measurement if name == "value" else f"{measurement}_{name}"
+            if len(metric_name) > _METRIC_NAME_MAX:
+                raise LineProtocolError(f"metric name {metric_name[:40]!r}... is too long")
+            samples.append((metric_name, value))
+        if not samples:
+            raise LineProtocolError("no numeric fields")
+
+        raw_source_id = tags.get("source_id")
+        if raw_source_id is not None:
+            source_id = self._source_id(raw_source_id)
+            self.records.extend(
+                (generate_uuid7(), source_type, source_id, metric_name, value, unit, timestamp)
+                for metric_name, value in samples
+            )
+        elif "vmid" in tags and source_type == "vm":
+            # Proxmox vmids are unique across a cluster; resolved after parsing
+            self.by_vmid.setdefault(int(tags["vmid"]), []).extend(
+                (metric_name, value, unit, timestamp) for metric_name, value in samples
+            )
+        else:
+            raise LineProtocolError("missing source_id tag")
+
+    def _source_id(self, raw: str) -> uuid.UUID:
+        source_id = self._source_ids.get(raw)
+        if source_id is None:
+            try:
+                source_id = self._source_ids[raw] = uuid.UUID(raw)
+            except ValueError:
+                raise LineProtocolError(f"invalid source_id {raw!r}") from None
+        return source_id
+
+    def _timestamp(self, raw: str) -> datetime:
+        timestamp = self._timestamps.get(raw)
+        if timestamp is None:
+            seconds, remainder = divmod(int(raw), self.divisor)
+            try:
+                timestamp = datetime.fromtimestamp(
+                    seconds + remainder / self.divisor, tz=timezone.utc
+                )
+            except (OverflowError, OSError, ValueError):
+                raise LineProtocolError(f"timestamp {raw} is out of range") from None
+            self._timestamps[raw] = timestamp
+        return timestamp
+
+    def resolve_vmids(self, vm_ids: dict[int, uuid.UUID]) -> None:
+        """Move vmid-tagged samples into ``records`` using ``vmid -> VM.id``."""
+        for vmid, samples in self.by_vmid.items():
+            vm_id = vm_ids.get(vmid)
+            if vm_id is None:
+                self._reject(f"unknown vmid {vmid}", len(samples))
+                continue
+            self.records.extend(
+                (generate_uuid7(), "vm", vm_id, metric_name, value, unit, timestamp)
+                for metric_name, value, unit, timestamp in samples
+            )
+        self.by_vmid.clear()
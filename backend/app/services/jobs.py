@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+from redis.asyncio import Redis as AsyncRedis
+
+if TYPE_CHECKING:
+    from app.models.vm import VM
+    from app.services.proxmox import ProxmoxClient
+
+logger = logging.getLogger(__name__)
+
+JOB_PREFIX = "nexops:jobs:"
+TRACKED_TASKS_KEY = "nexops:vm_tasks"
+TRACK_SCHEDULED_KEY = "nexops:vm_tasks:scheduled"
+
+TRACK_TASK = "app.workers.track_vm_tasks.track_vm_tasks"
+TRACK_POLL_INTERVAL = 2  # seconds between polls while tasks are outstanding
+TRACK_SCHEDULE_TTL = 30  # a scheduled run not seen within this long is presumed lost
+
+JOB_TTL = 86400  # job records are kept for a day
+TASK_TIMEOUT = 900  # give up on a Proxmox task not seen finishing after 15 minutes
+
+# VM status a successful action leaves behind, applied without waiting for a sync
+EXPECTED_STATUS = {"start": "running", "stop": "stopped", "restart": "running"}
+
+
+def job_status(items: Sequence[dict[str, Any]]) -> str:
+    """Summarize per-VM outcomes as running, succeeded, failed or partial."""
+    statuses = {item["status"] for item in items}
+    if statuses & {"pending", "running"}:
+        return "running"
+    if statuses == {"succeeded"}:
+        return "succeeded"
+    if statuses <= {"failed"}:
+        return "failed"
+    return "partial"
+
+
+def job_summary(job: dict[str, Any]) -> dict[str, Any]:
+    """Condense a job into the progress counts published to clients."""
+    counts: dict[str, int] = {}
+    for item in job["items"]:
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+    return {
+        "job_id": job["id"],
+        "action": job["action"],
+        "status": job["status"],
+        "total": len(job["items"]),
+        "counts": counts,
+    }
+
+
+def _node_from_upid(upid: str) -> str:
+    """Return the node name embedded in a UPID (``UPID:<node>:...``)."""
+    return upid.split(":")[1]
+
+
+class JobTracker:
+    """Tracks VM action jobs and the Proxmox tasks (UPIDs) behind them.
+
+    A job is a Redis hash holding its metadata plus one field per VM, so the
+    API submitting actions and the worker completing them never overwrite
+    each other's updates. Outstanding UPIDs live in a single hash that the
+    tracker worker polls, one Proxmox call per node.
+    """
+
+    def __init__(self, redis_client: AsyncRedis) -> None:
+        self.redis = redis_client
+
+    async def create_job(self, action: str, vms: Sequence[VM]) -> str:
+        """Record a new job with every VM pending and return its id."""
+        job_id = str(uuid.uuid4())
+        meta = {
+            "id": job_id,
+            "action": action,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        fields = {"meta": json.dumps(meta)}
+        for vm in vms:
+            fields[f"vm:{vm.id}"] = json.dumps({
+                "vm_id": str(vm.id),
+                "vmid": vm.vmid,
+                "name": vm.name,
+                "node": vm.node.proxmox_node_name if vm.node else None,
+                "status": "pending",
+                "upid": None,
+                "error": None,
+                "finished_at": None,
+            })
+        key = JOB_PREFIX + job_id
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, JOB_TTL)
+            await pipe.execute()
+        return job_id
+
+    async def mark_submitted(
+        self,
+        job_id: str,
+        vm_id: uuid.UUID,
+        vmid: int,
+        upid: str | None,
+        error: str | None = None,
+    ) -> None:
+        """Record the outcome of submitting one VM's action to Proxmox.
+
+        A returned UPID puts the VM in ``running`` and hands the task to the
+        tracker; no UPID means the submission itself failed.
+        """
+        key = JOB_PREFIX + job_id
+        raw_meta, raw_item = await self.redis.hmget(key, ["meta", f"vm:{vm_id}"])
+        if raw_meta is None or raw_item is None:
+            return
+        meta, item = json.loads(raw_meta), json.loads(raw_item)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if upid:
+                item.update(status="running", upid=upid)
+                pipe.hset(TRACKED_TASKS_KEY, upid, json.dumps({
+                    "job_id": job_id,
+                    "vm_id": str(vm_id),
+                    "vmid": vmid,
+                    "action": meta["action"],
+                    "started_at": int(time.time()),
+                }))
+            else:
+                item.update(
+                    status="failed",
+                    error=error or "Proxmox rejected the request",
+                    finished_at=datetime.now(timezone.utc).isoformat(),
+                )
+            pipe.hset(key, f"vm:{vm_id}", json.dumps(item))
+            await pipe.execute()
+
+    async def get_job(self, job_id: str) -> dict[str, Any] | None:
+        """Return a job with its per-VM items and overall status, or None."""
+        fields = await self.redis.hgetall(JOB_PREFIX + job_id)
+        if not fields:
+            return None
+        job = json.loads(fields.pop("meta"))
+        items = [json.loads(value) for value in fields.values()]
+        job["items"] = sorted(items, key=lambda item: item["vmid"])
+        job["status"] = job_status(items)
+        return job
+
+    async def schedule_poll(self, replace: bool = False) -> str | None:
+        """Claim the next tracker run, returning the token to pass it.
+
+        Only the run holding the current token keeps polling, so however many
+        actions are submitted there is one polling chain. Returns None when a
+        run is already scheduled and ``replace`` is False.
+        """
+        token = uuid.uuid4().hex
+        claimed = await self.redis.set(
+            TRACK_SCHEDULED_KEY, token, nx=not replace, ex=TRACK_SCHEDULE_TTL
+        )
+        return token if claimed else None
+
+    async def is_current_poll(self, token: str | None) -> bool:
+        """Return False if a newer tracker run has superseded this one."""
+        if token is None:
+            return True
+        current = await self.redis.get(TRACK_SCHEDULED_KEY)
+        return current is None or current == token
+
+    async def stop_polling(self) -> None:
+        """Clear the schedule so the next submitted action starts a new run."""
+        await self.redis.delete(TRACK_SCHEDULED_KEY)
+
+    async def pending_count(self) -> int:
+        """Return the number of Proxmox tasks still being tracked."""
+        return await self.redis.hlen(TRACKED_TASKS_KEY)
+
+    async def poll(self, proxmox: ProxmoxClient) -> list[dict[str, Any]]:
+        """Check outstanding UPIDs and record the ones that have finished.
+
+        Each node with outstanding tasks is queried once for its task list.
+        Returns the finished entries with their job id, VM, action and result.
+        """
+        tracked = {
+            upid: json.loads(entry)
+            for upid, entry in (await self.redis.hgetall(TRACKED_TASKS_KEY)).items()
+        }
+        if not tracked:
+            return []
+
+        by_node: dict[str, dict[str, dict[str, Any]]] = {}
+        for upid, entry in tracked.items():
+            by_node.setdefault(_node_from_upid(upid), {})[upid] = entry
+
+        results = await asyncio.gather(*(
+            self._poll_node(proxmox, node, entries) for node, entries in by_node.items()
+        ))
+        finished = [entry for node_finished in results for entry in node_finished]
+        if finished:
+            await self._record_finished(finished)
+        return finished
+
+    async def _poll_node(
+        self,
+        proxmox: ProxmoxClient,
+        node: str,
+        entries: dict[str, dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Resolve a node's outstanding UPIDs from a single task list call."""
+        since = min(entry["started_at"] for entry in entries.values()) - 60
+        tasks = await asyncio.to_thread(proxmox.get_node_tasks, node, since)
+        by_upid = {task.get("upid"): task for task in tasks}
+
+        now = int(time.time())
+        finished = []
+        for upid, entry in entries.items():
+            task = by_upid.get(upid)
+            if task is None:
+                # Not in the listing (e.g. pushed out by busier tasks); ask directly
+                status = await asyncio.to_thread(proxmox.get_task_status, node, upid)
+                if status.get("status") == "stopped":
+                    task = {"endtime": now, "status": status.get("exitstatus")}
+            if task is not None and "endtime" in task:
+                exitstatus = task.get("status") or "unknown"
+                finished.append({
+                    **entry,
+                    "upid": upid,
+                    "status": "succeeded" if exitstatus == "OK" else "failed",
+                    "error": None if exitstatus == "OK" else exitstatus,
+                })
+            elif now - entry["started_at"] > TASK_TIMEOUT:
+                finished.append({
+                    **entry,
+                    "upid": upid,
+                    "status": "failed",
+                    "error": "Timed out waiting for Proxmox task",
+                })
+        return finished
+
+    async def _record_finished(self, finished: list[dict[str, Any]]) -> None:
+        """Write final outcomes to their jobs and stop tracking the UPIDs."""
+        items = await asyncio.gather(*(
+            self._get_item(JOB_PREFIX + entry["job_id"], entry["vm_id"]) for entry in finished
+        ))
+        finished_at = datetime.now(timezone.utc).isoformat()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for entry, item in zip(finished, items):
+                pipe.hdel(TRACKED_TASKS_KEY, entry["upid"])
+                if item is None:
+                    continue  # the job record has expired
+                item.update(status=entry["status"], error=entry["error"], finished_at=finished_at)
+                pipe.hset(JOB_PREFIX + entry["job_id"], f"vm:{entry['vm_id']}", json.dumps(item))
+            await pipe.execute()
+
+    async def _get_item(self, key: str, vm_id: str) -> dict[str, Any] | None:
+        raw = await self.redis.hget(key, f"vm:{vm_id}")
+        return json.loads(raw) if raw else None
@@ -1,20 +1,34 @@
 from __future__ import annotations
 
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import func, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import database
+from app.config import settings
+from app.instrumentation import DB_QUERY_DURATION
 from app.models.alert import Alert
 from app.models.metric import Metric
 from app.models.node import Node
 from app.models.vm import VM
+from app.services.ingest import COPY_COLUMNS
 from app.services.proxmox import proxmox_client
 
 logger = logging.getLogger(__name__)
 
+# Order of values in each VM's row of a compact metrics batch
+VM_METRICS: tuple[tuple[str, str], ...] = (
+    ("cpu_usage", "percent"),
+    ("memory_usage", "percent"),
+    ("disk_usage", "percent"),
+    ("network_in", "bytes"),
+    ("network_out", "bytes"),
+)
+
 TIME_RANGE_MAP = {
     "1h": timedelta(hours=1),
     "6h": timedelta(hours=6),
@@ -90,23 +104,37 @@ class MetricsService:
         )
         return list(result.scalars().all())
 
-    async def collect_vm_metrics(self) -> None:
-        """Collect metrics from all VMs and store them in the database."""
-        vms_result = await self.session.execute(
-            select(VM).where(VM.status == "running")
+    async def get_collection_node_ids(self) -> list[uuid.UUID]:
+        """Return IDs of Proxmox nodes that currently host running VMs."""
+        result = await self.session.execute(
+            select(Node.id)
+            .join(VM, VM.node_id == Node.id)
+            .where(VM.status == "running", Node.proxmox_node_name.is_not(None))
+            .distinct()
         )
-        vms = list(vms_result.scalars().all())
-        now = datetime.now(timezone.utc)
+        return list(result.scalars().all())
 
-        for vm in vms:
-            node_result = await self.session.execute(
-                select(Node).where(Node.id == vm.node_id)
-            )
-            node = node_result.scalar_one_or_none()
-            if not node or not node.proxmox_node_name:
-                continue
+    async def collect_vm_metrics(self, node_id: uuid.UUID | None = None) -> dict:
+        """Collect metrics from running VMs and store them in the database.
+
+        When ``node_id`` is given only that node's VMs are collected, which is
+        how the per-node collection shards call it. Returns the new samples as
+        a compact batch: metric names and units once, then one row of values
+        per VM id in ``VM_METRICS`` order.
+        """
+        query = (
+            select(VM, Node.proxmox_node_name)
+            .join(Node, VM.node_id == Node.id)
+            .where(VM.status == "running", Node.proxmox_node_name.is_not(None))
+        )
+        if node_id:
+            query = query.where(VM.node_id == node_id)
+        vms = list((await self.session.execute(query)).all())
+        now = datetime.now(timezone.utc)
+        samples: dict[str, list[float]] = {}
 
-            status = self.proxmox.get_vm_status(node.proxmox_node_name, vm.vmid)
+        for vm, node_name in vms:
+            status = self.proxmox.get_vm_status(node_name, vm.vmid)
             if not status:
                 continue
 
@@ -115,15 +143,16 @@ class MetricsService:
             maxdisk = status.get("maxdisk", 1)
             disk = status.get("disk", 0)
 
-            metrics_data = [
-                ("cpu_usage", round(status.get("cpu", 0) * 100, 2), "percent"),
-                ("memory_usage", round((mem / maxmem) * 100, 2) if maxmem else 0, "percent"),
-                ("disk_usage", round((disk / maxdisk) * 100, 2) if maxdisk else 0, "percent"),
-                ("network_in", status.get("netin", 0), "bytes"),
-                ("network_out", status.get("netout", 0), "bytes"),
+            values = [
+                round(status.get("cpu", 0) * 100, 2),
+                round((mem / maxmem) * 100, 2) if maxmem else 0,
+                round((disk / maxdisk) * 100, 2) if maxdisk else 0,
+                status.get("netin", 0),
+                status.get("netout", 0),
             ]
+            samples[str(vm.id)] = values
 
-            for metric_name, value, unit in metrics_data:
+            for (metric_name, unit), value in zip(VM_METRICS, values):
                 metric = Metric(
                     source_type="vm",
                     source_id=vm.id,
@@ -135,4 +164,90 @@ class MetricsService:
                 self.session.add(metric)
 
         await self.session.commit()
-        logger.info("Collected metrics for %d running VMs", len(vms))
+        logger.info("Collected metrics for %d running VMs", len(samples))
+        return {
+            "timestamp": now.isoformat(),
+            "metrics": [name for name, _ in VM_METRICS],
+            "units": [unit for _, unit in VM_METRICS],
+            "samples": samples,
+        }
+
+    async def write_samples(self, rows: list[dict]) -> None:
+        """Bulk insert metric rows (dicts of Metric column values) in one statement."""
+        if not rows:
+            return
+        await self.session.execute(insert(Metric), rows)
+
+    async def copy_samples(self, records: list[tuple]) -> None:
+        """Bulk load metric records with PostgreSQL ``COPY``.
+
+        ``records`` are tuples in ``COPY_COLUMNS`` order. Much faster than
+        ``write_samples`` for large pushed batches; runs in the session's
+        transaction, so the caller still commits.
+        """
+        if not records:
+            return
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+        if not driver.is_in_transaction():
+            # The asyncpg adapter only sends BEGIN with the first statement it
+            # runs; COPY goes around it and would otherwise autocommit
+            await connection.exec_driver_sql("SELECT 1")
+        # Bypasses the engine's cursor events, so it is timed here
+        started = time.perf_counter()
+        try:
+            await driver.copy_records_to_table(
+                Metric.__tablename__, records=records, columns=COPY_COLUMNS
+            )
+        finally:
+            DB_QUERY_DURATION.labels(database.current_role).observe(
+                time.perf_counter() - started
+            )
+
+    async def get_vm_ids_by_vmid(self, vmids: list[int]) -> dict[int, uuid.UUID]:
+        """Map Proxmox vmids to VM ids in one query."""
+        if not vmids:
+            return {}
+        result = await self.session.execute(select(VM.vmid, VM.id).where(VM.vmid.in_(vmids)))
+        return {vmid: vm_id for vmid, vm_id in result.all()}
+
+    async def record_latency_percentiles(
+        self,
+        service_ids: list[uuid.UUID],
+        now: datetime,
+    ) -> None:
+        """Store rolling p50/p95 response times for the given services as samples.
+
+        Percentiles are computed in a single grouped query over the last
+        ``health_check_latency_window_minutes`` of ``response_time_ms`` samples.
+        """
+        if not service_ids:
+            return
+        since = now - timedelta(minutes=settings.health_check_latency_window_minutes)
+        result = await self.session.execute(
+            select(
+                Metric.source_id,
+                func.percentile_cont(0.5).within_group(Metric.value.asc()),
+                func.percentile_cont(0.95).within_group(Metric.value.asc()),
+            )
+            .where(
+                Metric.source_type == "service",
+                Metric.source_id.in_(service_ids),
+                Metric.metric_name == "response_time_ms",
+                Metric.timestamp >= since,
+            )
+            .group_by(Metric.source_id)
+        )
+        rows = []
+        for source_id, p50, p95 in result.all():
+            for metric_name, value in (("response_time_p50_ms", p50), ("response_time_p95_ms", p95)):
+                rows.append({
+                    "source_type": "service",
+                    "source_id": source_id,
+                    "metric_name": metric_name,
+                    "value": round(value, 2),
+                    "unit": "ms",
+                    "timestamp": now,
+                })
+        await self.write_samples(rows)
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlparse
+
+import httpx
+import redis
+from redis.asyncio import Redis as AsyncRedis
+
+from app.config import settings
+from app.services.url_safety import is_url_safe
+from app.workers.runtime import get_sync_redis
+
+if TYPE_CHECKING:
+    from app.models.alert import Alert, AlertRule
+
+logger = logging.getLogger(__name__)
+
+QUEUE_PREFIX = "nexops:notifications:queue:"
+PENDING_CHANNELS_KEY = "nexops:notifications:pending"
+DEAD_LETTER_KEY = "nexops:notifications:dead"
+RATE_LIMIT_PREFIX = "nexops:notifications:rate:"
+PAUSED_PREFIX = "nexops:notifications:paused:"
+
+DEFAULT_RETRY_AFTER = 60  # seconds to pause a channel that sent 429 without Retry-After
+MAX_RETRY_AFTER = 3600
+
+# Outcomes of delivering one batch
+SENT = "sent"
+DEFERRED = "deferred"  # back on the queue for a later run
+FAILED = "failed"  # dead-lettered
+
+DISPATCH_TASK = "app.workers.dispatch_notifications.dispatch_notifications"
+
+def _is_webhook_channel(channel: str) -> bool:
+    """Return True if the channel is a deliverable http(s) webhook URL."""
+    parsed = urlparse(channel)
+    return parsed.scheme in {"http", "https"} and bool(parsed.hostname)
+
+
+def _retry_after(response: httpx.Response) -> int:
+    """Seconds a 429 response asks us to wait, from delta-seconds or an HTTP date."""
+    value = response.headers.get("retry-after", "").strip()
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    if value.isdigit():
+        seconds = int(value)
+    else:
+        try:
+            seconds = int((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return DEFAULT_RETRY_AFTER
+    return min(max(seconds, 1), MAX_RETRY_AFTER)
+
+
+def enqueue_notification(channels: list[str], payload: dict[str, Any]) -> int:
+    """Queue a notification for each channel and wake the dispatcher.
+
+    Only touches Redis, so callers (alert evaluation, API handlers) never wait
+    on webhook delivery. Returns the number of channels queued.
+    """
+    if not channels:
+        return 0
+    message = json.dumps(payload, default=str)
+    try:
+        pipe = get_sync_redis().pipeline(transaction=False)
+        for channel in channels:
+            pipe.rpush(QUEUE_PREFIX + channel, message)
+            pipe.sadd(PENDING_CHANNELS_KEY, channel)
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("Failed to enqueue notification", exc_info=True)
+        return 0
+
+    from app.workers.celery_app import celery_app
+
+    celery_app.send_task(DISPATCH_TASK)
+    return len(channels)
+
+
+def build_alert_payload(rule: AlertRule, alert: Alert) -> dict[str, Any]:
+    """Build the webhook payload describing a fired or resolved alert."""
+    return {
+        "alert_id": str(alert.id),
+        "rule_id": str(rule.id),
+        "rule_name": rule.name,
+        "metric_name": rule.metric_name,
+        "threshold": rule.threshold,
+        "severity": alert.severity,
+        "status": alert.status,
+        "title": alert.title,
+        "description": alert.description,
+        "source_type": alert.source_type,
+        "source_id": str(alert.source_id),
+        "fired_at": alert.fired_at.isoformat() if alert.fired_at else None,
+        "resolved_at": alert.resolved_at.isoformat() if alert.resolved_at else None,
+    }
+
+
+def notify_alert(rule: AlertRule, alert: Alert) -> int:
+    """Queue an alert for delivery to the rule's notification channels.
+
+    Entry point for alert evaluation; nothing creates ``Alert`` rows yet.
+    """
+    return enqueue_notification(
+        rule.notification_channels or [], build_alert_payload(rule, alert)
+    )
+
+
+class NotificationDispatcher:
+    """Drains per-channel notification queues and delivers them as batched webhooks.
+
+    Channels are drained concurrently, so a slow endpoint only delays its own
+    queue. Each channel gets a fixed-window request budget shared across all
+    dispatcher processes via Redis; every POST, retries included, uses one
+    request from it. A channel answering 429 is paused for its Retry-After.
+    """
+
+    def __init__(self, redis_client: AsyncRedis, http_client: httpx.AsyncClient) -> None:
+        self.redis = redis_client
+        self.http = http_client
+
+    async def dispatch_pending(self) -> dict[str, int]:
+        """Deliver everything currently queued. Returns delivered counts per channel."""
+        channels = sorted(await self.redis.smembers(PENDING_CHANNELS_KEY))
+        if not channels:
+            return {}
+        delivered = await asyncio.gather(
+            *(self._drain_channel(channel) for channel in channels)
+        )
+        return dict(zip(channels, delivered))
+
+    async def _drain_channel(self, channel: str) -> int:
+        """Send batches for one channel until it is empty, paused or rate limited."""
+        key = QUEUE_PREFIX + channel
+        delivered = 0
+        while True:
+            if not await self.redis.llen(key):
+                await self.redis.srem(PENDING_CHANNELS_KEY, channel)
+                # An enqueue may have raced the SREM; re-mark so it isn't stranded.
+                if await self.redis.llen(key):
+                    await self.redis.sadd(PENDING_CHANNELS_KEY, channel)
+                    continue
+                return delivered
+
+            if await self.redis.exists(PAUSED_PREFIX + channel):
+                return delivered
+
+            batch = await self.redis.lpop(key, settings.notification_batch_size)
+            if not batch:
+                continue
+
+            try:
+                outcome = await self._deliver(channel, batch)
+            except asyncio.CancelledError:
+                # Interrupted mid-delivery (e.g. the task's soft time limit):
+                # put the batch back at the head of the queue for the next run.
+                await self.redis.lpush(key, *reversed(batch))
+                raise
+            if outcome == SENT:
+                delivered += len(batch)
+            elif outcome == DEFERRED:
+                await self.redis.lpush(key, *reversed(batch))
+                return delivered
+            else:
+                await self.redis.rpush(
+                    DEAD_LETTER_KEY,
+                    *(json.dumps({"channel": channel, "payload": m}) for m in batch),
+                )
+
+    async def _acquire_rate_slot(self, channel: str) -> bool:
+        """Consume one request from the channel's per-minute budget."""
+        window = int(time.time() // 60)
+        key = f"{RATE_LIMIT_PREFIX}{channel}:{window}"
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.incr(key)
+        pipe.expire(key, 120)
+        count, _ = await pipe.execute()
+        return count <= settings.notification_rate_limit_per_minute
+
+    async def _deliver(self, channel: str, batch: list[str]) -> str:
+        """POST a batch to the channel, retrying 5xx errors with exponential backoff.
+
+        Returns ``SENT``, ``FAILED`` (dead-letter the batch) or ``DEFERRED``
+        when the channel's budget ran out or it answered 429.
+        """
+        if not _is_webhook_channel(channel):
+            logger.warning("Dropping %d notifications for unsupported channel %s", len(batch), channel)
+            return FAILED
+        if not await is_url_safe(channel, settings.notification_allowed_hosts):
+            logger.warning(
+                "Blocked %d notifications for %s: URL resolves to a private address",
+                len(batch),
+                channel,
+            )
+            return FAILED
+
+        body = {"notifications": [json.loads(message) for message in batch]}
+        for attempt in range(settings.notification_max_retries + 1):
+            if not await self._acquire_rate_slot(channel):
+                logger.info("Rate limit reached for channel %s, deferring", channel)
+                return DEFERRED
+            try:
+                response = await self.http.post(channel, json=body)
+                if response.status_code < 400:
+                    logger.debug("Delivered %d notifications to %s", len(batch), channel)
+                    return SENT
+                if response.status_code == 429:
+                    delay = _retry_after(response)
+                    logger.info("Channel %s asked to retry after %ds", channel, delay)
+                    await self.redis.set(PAUSED_PREFIX + channel, "1", ex=delay)
+                    return DEFERRED
+                if response.status_code < 500:
+                    logger.warning(
+                        "Channel %s rejected notifications with HTTP %d",
+                        channel,
+                        response.status_code,
+                    )
+                    return FAILED
+                logger.warning(
+                    "Channel %s returned HTTP %d (attempt %d)",
+                    channel,
+                    response.status_code,
+                    attempt + 1,
+                )
+            except httpx.RequestError:
+                logger.warning("Delivery to %s failed (attempt %d)", channel, attempt + 1)
+
+            if attempt < settings.notification_max_retries:
+                await asyncio.sleep(settings.notification_retry_backoff * 2**attempt)
+
+        logger.error("Giving up on %d notifications for %s", len(batch), channel)
+        return FAILED
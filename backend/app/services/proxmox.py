@@ -7,6 +7,7 @@ from proxmoxer import ProxmoxAPI
 from requests.exceptions import RequestException
 
 from app.config import settings
+from app.instrumentation import instrument_proxmox
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,7 @@ class ProxmoxClient:
             self._api = self._connect()
         return self._api
 
+    @instrument_proxmox("nodes")
     def get_nodes(self) -> list[dict[str, Any]]:
         """Retrieve all nodes from the Proxmox cluster."""
         try:
@@ -50,6 +52,7 @@ class ProxmoxClient:
             logger.exception("Failed to fetch nodes from Proxmox")
             return []
 
+    @instrument_proxmox("node_status")
     def get_node_status(self, node_name: str) -> dict[str, Any]:
         """Retrieve detailed status for a specific node."""
         try:
@@ -58,6 +61,7 @@ class ProxmoxClient:
             logger.exception("Failed to fetch status for node %s", node_name)
             return {}
 
+    @instrument_proxmox("qemu_list")
     def get_vms(self, node_name: str) -> list[dict[str, Any]]:
         """Retrieve all QEMU VMs on a node."""
         try:
@@ -66,6 +70,7 @@ class ProxmoxClient:
             logger.exception("Failed to fetch VMs for node %s", node_name)
             return []
 
+    @instrument_proxmox("lxc_list")
     def get_containers(self, node_name: str) -> list[dict[str, Any]]:
         """Retrieve all LXC containers on a node."""
         try:
@@ -74,6 +79,7 @@ class ProxmoxClient:
             logger.exception("Failed to fetch containers for node %s", node_name)
             return []
 
+    @instrument_proxmox("qemu_status")
     def get_vm_status(self, node_name: str, vmid: int) -> dict[str, Any]:
         """Retrieve current status for a specific VM."""
         try:
@@ -82,6 +88,7 @@ class ProxmoxClient:
             logger.exception("Failed to fetch status for VM %s on %s", vmid, node_name)
             return {}
 
+    @instrument_proxmox("qemu_config")
     def get_vm_config(self, node_name: str, vmid: int) -> dict[str, Any]:
         """Retrieve configuration for a specific VM."""
         try:
@@ -90,6 +97,7 @@ class ProxmoxClient:
             logger.exception("Failed to fetch config for VM %s on %s", vmid, node_name)
             return {}
 
+    @instrument_proxmox("qemu_start")
     def start_vm(self, node_name: str, vmid: int) -> str | None:
         """Start a VM. Returns the task UPID or None on failure."""
         try:
@@ -100,6 +108,7 @@ class ProxmoxClient:
             logger.exception("Failed to start VM %s on %s", vmid, node_name)
             return None
 
+    @instrument_proxmox("qemu_stop")
     def stop_vm(self, node_name: str, vmid: int) -> str | None:
         """Stop a VM. Returns the task UPID or None on failure."""
         try:
@@ -110,6 +119,7 @@ class ProxmoxClient:
             logger.exception("Failed to stop VM %s on %s", vmid, node_name)
             return None
 
+    @instrument_proxmox("qemu_reboot")
     def restart_vm(self, node_name: str, vmid: int) -> str | None:
         """Restart a VM via reboot. Returns the task UPID or None on failure."""
         try:
@@ -120,5 +130,23 @@ class ProxmoxClient:
             logger.exception("Failed to restart VM %s on %s", vmid, node_name)
             return None
 
+    @instrument_proxmox("task_list")
+    def get_node_tasks(self, node_name: str, since: int, limit: int = 500) -> list[dict[str, Any]]:
+        """Retrieve active and finished tasks on a node started at or after ``since``."""
+        try:
+            return self.api.nodes(node_name).tasks.get(source="all", since=since, limit=limit)
+        except RequestException:
+            logger.exception("Failed to fetch tasks for node %s", node_name)
+            return []
+
+    @instrument_proxmox("task_status")
+    def get_task_status(self, node_name: str, upid: str) -> dict[str, Any]:
+        """Retrieve the status of a single task by UPID."""
+        try:
+            return self.api.nodes(node_name).tasks(upid).status.get()
+        except RequestException:
+            logger.exception("Failed to fetch status for task %s on %s", upid, node_name)
+            return {}
+
 
 proxmox_client = ProxmoxClient()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import socket
+import time
+from collections.abc import Collection
+from urllib.parse import urlparse
+
+from app.config import settings
+
+# hostname -> (expires_at, is_safe); shared by everything in the same process
+_dns_cache: dict[str, tuple[float, bool]] = {}
+
+
+async def is_url_safe(url: str, allowed_hosts: Collection[str] = ()) -> bool:
+    """Check that URL does not resolve to a private, loopback, or link-local IP.
+
+    Resolution goes through the event loop's resolver so it never blocks other
+    requests, and each hostname's verdict is cached for a short TTL. Hosts in
+    ``allowed_hosts`` skip the check.
+    """
+    parsed = urlparse(url)
+    hostname = parsed.hostname
+    if not hostname:
+        return False
+    if hostname in allowed_hosts:
+        return True
+
+    now = time.monotonic()
+    cached = _dns_cache.get(hostname)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    safe = True
+    try:
+        resolved = await asyncio.get_running_loop().getaddrinfo(hostname, None)
+        for _, _, _, _, sockaddr in resolved:
+            ip = ipaddress.ip_address(sockaddr[0])
+            if ip.is_private or ip.is_loopback or ip.is_link_local:
+                safe = False
+                break
+    except (socket.gaierror, ValueError):
+        safe = False
+
+    _dns_cache[hostname] = (now + settings.health_check_dns_cache_ttl, safe)
+    return safe
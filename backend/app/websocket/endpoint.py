@@ -4,6 +4,7 @@ import logging
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.websocket.frames import ENCODERS
 from app.websocket.manager import ws_manager
 
 logger = logging.getLogger(__name__)
@@ -12,13 +13,34 @@ router = APIRouter()
 
 
 @router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket) -> None:
-    """WebSocket endpoint for real-time event streaming."""
-    await ws_manager.connect(websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    encoding: str = "json",
+    last_event_id: str | None = None,
+) -> None:
+    """WebSocket endpoint for real-time event streaming.
+
+    Clients narrow what they receive with
+    ``{"action": "subscribe" | "unsubscribe", "topics": [...]}``, where a topic
+    is an event type, ``vm:<id>``, ``node:<id>`` or ``*``.
+
+    ``?encoding=`` selects the frame format: ``json`` (text, default),
+    ``deflate`` (zlib-compressed JSON, binary) or ``msgpack`` (binary, when
+    the optional dependency is installed).
+
+    Every event carries an ``id``. A client reconnecting with
+    ``?last_event_id=<id>`` is sent only the events it missed, or a ``resync``
+    event when they are no longer retained and it must refetch.
+    """
+    if encoding not in ENCODERS:
+        await websocket.close(code=1003)
+        return
+    await ws_manager.connect(websocket, encoding, last_event_id)
     try:
         while True:
-            # Keep the connection alive; client may send pong or text
-            await websocket.receive_text()
+            # Client sends "pong" keepalives and subscribe/unsubscribe messages
+            text = await websocket.receive_text()
+            ws_manager.handle_message(websocket, text)
     except WebSocketDisconnect:
         ws_manager.disconnect(websocket)
     except Exception:
@@ -1,38 +1,138 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 from typing import Any
 
 import redis
+from redis.asyncio import Redis as AsyncRedis
 
 from app.config import settings
+from app.workers.runtime import get_sync_redis
 
 logger = logging.getLogger(__name__)
 
-CHANNEL = "nexops:events"
+# Capped Redis Stream of published events; entry IDs double as client resume offsets
+EVENT_STREAM = "nexops:events"
+EVENT_STREAM_MAXLEN = 10_000
 
-_redis_client: redis.Redis | None = None
+# Topic every client starts on; it matches all events.
+ALL_TOPICS = "*"
 
+PUBLISH_BATCH_SIZE = 100  # events sent per pipelined round trip
+PUBLISH_QUEUE_SIZE = 10_000  # events buffered before new ones are dropped
 
-def _get_redis() -> redis.Redis:
-    """Lazily create a sync Redis client (safe in both Celery and FastAPI)."""
-    global _redis_client
-    if _redis_client is None:
-        _redis_client = redis.Redis.from_url(
-            settings.redis_url, decode_responses=True
-        )
-    return _redis_client
+def _encode_event(event_type: str, data: dict[str, Any] | None) -> str:
+    return json.dumps({"type": event_type, "data": data or {}}, separators=(",", ":"))
 
 
 def publish_event(event_type: str, data: dict[str, Any] | None = None) -> None:
-    """Publish an event to the nexops:events Redis channel.
+    """Append an event to the nexops:events Redis stream.
 
-    Callable from Celery workers (sync) and FastAPI endpoints (sync context).
+    Blocks on a Redis round trip, so it is meant for Celery workers. Code
+    running inside the FastAPI app should use ``event_publisher`` instead.
     """
-    message = json.dumps({"type": event_type, "data": data or {}})
+    message = _encode_event(event_type, data)
     try:
-        _get_redis().publish(CHANNEL, message)
+        get_sync_redis().xadd(
+            EVENT_STREAM,
+            {"event": message},
+            maxlen=EVENT_STREAM_MAXLEN,
+            approximate=True,
+        )
         logger.debug("Published event %s", event_type)
     except redis.RedisError:
         logger.warning("Failed to publish event %s", event_type, exc_info=True)
+
+
+class EventPublisher:
+    """Non-blocking event publisher for the ASGI app.
+
+    ``publish`` only enqueues; a background task drains the queue and appends
+    events to the stream in pipelined batches, so request handlers never wait
+    on Redis and bursts cost one round trip per batch.
+    """
+
+    def __init__(self) -> None:
+        self._redis: AsyncRedis | None = None
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=PUBLISH_QUEUE_SIZE)
+        self._task: asyncio.Task | None = None
+
+    async def startup(self) -> None:
+        """Connect to Redis and start the flush loop."""
+        self._redis = AsyncRedis.from_url(settings.redis_url, decode_responses=True)
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def shutdown(self) -> None:
+        """Flush queued events, then stop the loop and close Redis."""
+        if self._task:
+            self._task.cancel()
+            await self._task
+        while not self._queue.empty():
+            await self._flush(self._take_batch())
+        if self._redis:
+            await self._redis.aclose()
+
+    def publish(self, event_type: str, data: dict[str, Any] | None = None) -> None:
+        """Queue an event for the stream without waiting on Redis."""
+        try:
+            self._queue.put_nowait(_encode_event(event_type, data))
+        except asyncio.QueueFull:
+            logger.warning("Event queue full, dropping event %s", event_type)
+
+    def _take_batch(self) -> list[str]:
+        batch = []
+        while len(batch) < PUBLISH_BATCH_SIZE and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                first = await self._queue.get()
+                await self._flush([first, *self._take_batch()])
+            except asyncio.CancelledError:
+                break
+
+    async def _flush(self, messages: list[str]) -> None:
+        """Append a batch of events to the stream in one pipelined round trip."""
+        if not messages or self._redis is None:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for message in messages:
+                    pipe.xadd(
+                        EVENT_STREAM,
+                        {"event": message},
+                        maxlen=EVENT_STREAM_MAXLEN,
+                        approximate=True,
+                    )
+                await pipe.execute()
+            logger.debug("Published %d events", len(messages))
+        except redis.RedisError:
+            logger.warning("Failed to publish %d events", len(messages), exc_info=True)
+
+
+event_publisher = EventPublisher()
+
+
+def event_topics(event: dict[str, Any]) -> set[str]:
+    """Return the topics an event is delivered on.
+
+    Every event matches ``*`` and its own type; events about a specific VM or
+    node also match ``vm:<id>`` / ``node:<id>``.
+    """
+    topics = {ALL_TOPICS, event.get("type", "")}
+    data = event.get("data") or {}
+    if data.get("vm_id"):
+        topics.add(f"vm:{data['vm_id']}")
+    if data.get("node_id"):
+        topics.add(f"node:{data['node_id']}")
+    return topics
+
+
+def stream_id_key(entry_id: str) -> tuple[int, int]:
+    """Turn a Redis stream entry ID (``"<ms>-<seq>"``) into a sortable tuple."""
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # optional dependency, see the "msgpack" extra
+    msgpack = None
+
+
+class Frame:
+    """An outgoing WebSocket message shared by every recipient.
+
+    Each wire encoding is produced at most once, on first use, and the same
+    ``str``/``bytes`` object is then written to every subscriber using it.
+    """
+
+    __slots__ = ("payload", "event_id", "_encoded")
+
+    def __init__(
+        self,
+        payload: dict[str, Any],
+        text: str | None = None,
+        event_id: str | None = None,
+    ) -> None:
+        self.payload = payload
+        # Newest event stream ID carried by this frame, if any
+        self.event_id = event_id
+        self._encoded: dict[str, str | bytes] = {}
+        if text is not None:
+            # Already-serialized JSON (e.g. straight from Redis) is reused as-is
+            self._encoded["json"] = text
+
+    def encode(self, encoding: str) -> str | bytes:
+        """Return this frame in the given encoding, encoding it only once."""
+        encoded = self._encoded.get(encoding)
+        if encoded is None:
+            encoded = ENCODERS[encoding](self)
+            self._encoded[encoding] = encoded
+        return encoded
+
+
+def _encode_json(frame: Frame) -> str:
+    return json.dumps(frame.payload, separators=(",", ":"))
+
+
+def _encode_deflate(frame: Frame) -> bytes:
+    return zlib.compress(frame.encode("json").encode(), 6)
+
+
+ENCODERS: dict[str, Callable[[Frame], str | bytes]] = {
+    "json": _encode_json,
+    "deflate": _encode_deflate,
+}
+if msgpack is not None:
+    ENCODERS["msgpack"] = lambda frame: msgpack.packb(frame.payload)
+
+PING_FRAME = Frame({"type": "ping"})
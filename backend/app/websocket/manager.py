@@ -3,32 +3,109 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import re
+from collections.abc import Iterable
 
 from fastapi import WebSocket
 from redis.asyncio import Redis
 
 from app.config import settings
-from app.websocket.events import CHANNEL
+from app.instrumentation import WS_FRAMES_DROPPED, WS_SLOW_DISCONNECTS
+from app.websocket.events import ALL_TOPICS, EVENT_STREAM, event_topics, stream_id_key
+from app.websocket.frames import PING_FRAME, Frame
 
 logger = logging.getLogger(__name__)
 
 HEARTBEAT_INTERVAL = 30  # seconds
+COALESCE_WINDOW = 0.25  # seconds to buffer events before sending a batch
+SEND_QUEUE_SIZE = 64  # frames buffered per client before the oldest is dropped
+MAX_DROPPED = 256  # frames dropped since the queue last drained before disconnecting
+MAX_TOPICS = 256  # topic subscriptions allowed per client
+MAX_REPLAY = 1000  # missed events replayed on resume before asking for a full resync
+STREAM_ID_PATTERN = re.compile(r"^\d+-\d+$")
+
+
+class ClientConnection:
+    """A connected client with its own bounded send queue and writer task.
+
+    Broadcasting only enqueues, so a client on a slow link delays nobody but
+    itself. When its queue is full the oldest frame is dropped (newer events
+    supersede older ones), and a client that keeps falling behind is closed.
+    """
+
+    def __init__(self, websocket: WebSocket, encoding: str = "json") -> None:
+        self.websocket = websocket
+        self.encoding = encoding
+        self.queue: asyncio.Queue[Frame] = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.dropped = 0
+        self.writer: asyncio.Task | None = None
+        self.topics: set[str] = {ALL_TOPICS}
+        self.subscribed = False
+        # Live frames parked while a resuming client's gap is being replayed
+        self.held: list[Frame] | None = None
+
+    def offer(self, frame: Frame) -> bool:
+        """Queue a frame without blocking. Returns False once the client is too slow."""
+        if self.held is not None:
+            self.held.append(frame)
+            return len(self.held) < MAX_DROPPED
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            WS_FRAMES_DROPPED.inc()
+        self.queue.put_nowait(frame)
+        return self.dropped < MAX_DROPPED
+
+    async def write_loop(self) -> None:
+        """Drain the queue to the socket until the connection fails."""
+        while True:
+            data = (await self.queue.get()).encode(self.encoding)
+            if isinstance(data, str):
+                await self.websocket.send_text(data)
+            else:
+                await self.websocket.send_bytes(data)
+            if self.queue.empty():
+                self.dropped = 0
 
 
 class ConnectionManager:
-    """Manages WebSocket connections and relays Redis pub/sub events."""
+    """Manages WebSocket connections and relays events from the Redis stream.
+
+    Clients receive every event until they send their first ``subscribe``
+    message; after that only events on their topics. A topic index maps each
+    topic to its connections so delivery cost follows subscribers per topic.
+    """
 
     def __init__(self) -> None:
-        self._connections: set[WebSocket] = set()
+        self._connections: dict[WebSocket, ClientConnection] = {}
+        self._topic_index: dict[str, set[WebSocket]] = {}
         self._redis: Redis | None = None
         self._subscriber_task: asyncio.Task | None = None
         self._heartbeat_task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+        # Close handshakes with dropped slow clients, run off the delivery path
+        self._closing: set[asyncio.Task] = set()
+        self._pending: dict[str, str] = {}
+        self._pending_event = asyncio.Event()
+
+    def stats(self) -> dict[str, int]:
+        """Return connection and queue gauges for instrumentation."""
+        # Called from the metrics scrape thread; copy the clients in one step
+        clients = list(self._connections.values())
+        depths = [client.queue.qsize() for client in clients]
+        return {
+            "connections": len(depths),
+            "queued_frames": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "pending_events": len(self._pending),
+        }
 
     async def startup(self) -> None:
         """Start the Redis subscriber and heartbeat loops."""
         self._redis = Redis.from_url(settings.redis_url, decode_responses=True)
         self._subscriber_task = asyncio.create_task(self._subscribe())
         self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        self._flush_task = asyncio.create_task(self._flush_loop())
         logger.info("WebSocket manager started")
 
     async def shutdown(self) -> None:
@@ -37,66 +114,279 @@ class ConnectionManager:
             self._subscriber_task.cancel()
         if self._heartbeat_task:
             self._heartbeat_task.cancel()
+        if self._flush_task:
+            self._flush_task.cancel()
         for ws in list(self._connections):
+            self.disconnect(ws)
             await self._safe_close(ws)
-        self._connections.clear()
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
         if self._redis:
             await self._redis.aclose()
         logger.info("WebSocket manager stopped")
 
-    async def connect(self, websocket: WebSocket) -> None:
-        """Accept and track a new WebSocket connection."""
+    async def connect(
+        self,
+        websocket: WebSocket,
+        encoding: str = "json",
+        last_event_id: str | None = None,
+    ) -> None:
+        """Accept and track a new WebSocket connection.
+
+        A client reconnecting with ``last_event_id`` first receives the events
+        it missed as one batch, or a ``resync`` event when the gap is no longer
+        in the stream, before any live events.
+        """
         await websocket.accept()
-        self._connections.add(websocket)
+        client = ClientConnection(websocket, encoding)
+        if last_event_id:
+            client.held = []
+        client.writer = asyncio.create_task(self._run_writer(client))
+        self._connections[websocket] = client
+        self._topic_index.setdefault(ALL_TOPICS, set()).add(websocket)
         logger.info("WebSocket client connected (%d total)", len(self._connections))
 
+        if last_event_id:
+            await self._replay(client, last_event_id)
+
+    async def _replay(self, client: ClientConnection, last_event_id: str) -> None:
+        """Queue the events a resuming client missed, then release held live frames."""
+        replayed_to = last_event_id
+        try:
+            frame = await self._build_replay(last_event_id)
+        except Exception:
+            logger.warning("Event replay failed", exc_info=True)
+            frame = Frame({"type": "resync"})
+
+        held, client.held = client.held or [], None
+        if frame is not None:
+            client.offer(frame)
+            replayed_to = frame.event_id or replayed_to
+        for live in held:
+            if live.event_id is None or (
+                STREAM_ID_PATTERN.match(replayed_to)
+                and stream_id_key(live.event_id) > stream_id_key(replayed_to)
+            ):
+                client.offer(live)
+
+    async def _build_replay(self, last_event_id: str) -> Frame | None:
+        """Return a batch of events after ``last_event_id``, or a resync frame."""
+        assert self._redis is not None
+        if not STREAM_ID_PATTERN.match(last_event_id):
+            return Frame({"type": "resync"})
+
+        oldest = await self._redis.xrange(EVENT_STREAM, count=1)
+        if oldest and stream_id_key(oldest[0][0]) > stream_id_key(last_event_id):
+            # The stream was trimmed past the client's offset; the gap is lost
+            return Frame({"type": "resync"})
+
+        entries = await self._redis.xrange(
+            EVENT_STREAM, min=f"({last_event_id}", count=MAX_REPLAY + 1
+        )
+        if len(entries) > MAX_REPLAY:
+            return Frame({"type": "resync"})
+        if not entries:
+            return None
+
+        events = []
+        for entry_id, fields in entries:
+            event = json.loads(fields["event"])
+            event["id"] = entry_id
+            events.append(event)
+        last_id = entries[-1][0]
+        return Frame({"type": "batch", "id": last_id, "events": events}, event_id=last_id)
+
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove a disconnected client."""
-        self._connections.discard(websocket)
+        client = self._connections.pop(websocket, None)
+        if client is None:
+            return
+        self._remove_topics(websocket, client, set(client.topics))
+        if client.writer:
+            client.writer.cancel()
         logger.info("WebSocket client disconnected (%d total)", len(self._connections))
 
-    async def broadcast(self, message: str) -> None:
-        """Send a message to all connected clients."""
-        stale: list[WebSocket] = []
-        for ws in self._connections:
-            try:
-                await ws.send_text(message)
-            except Exception:
-                stale.append(ws)
-        for ws in stale:
-            self._connections.discard(ws)
+    def handle_message(self, websocket: WebSocket, text: str) -> None:
+        """Apply a client control message such as ``{"action": "subscribe", "topics": [...]}``."""
+        try:
+            message = json.loads(text)
+        except ValueError:
+            return  # plain-text keepalives such as "pong"
+        if not isinstance(message, dict):
+            return
+        topics = message.get("topics")
+        if not isinstance(topics, list) or not all(isinstance(t, str) for t in topics):
+            return
+        if message.get("action") == "subscribe":
+            self.subscribe(websocket, set(topics))
+        elif message.get("action") == "unsubscribe":
+            self.unsubscribe(websocket, set(topics))
+
+    def subscribe(self, websocket: WebSocket, topics: set[str]) -> None:
+        """Add topics for a client; the first subscribe replaces the default ``*``."""
+        client = self._connections.get(websocket)
+        if client is None:
+            return
+        if not client.subscribed:
+            client.subscribed = True
+            self._remove_topics(websocket, client, {ALL_TOPICS} - topics)
+        for topic in topics:
+            if len(client.topics) >= MAX_TOPICS:
+                logger.warning("WebSocket client exceeded %d topics", MAX_TOPICS)
+                break
+            client.topics.add(topic)
+            self._topic_index.setdefault(topic, set()).add(websocket)
+
+    def unsubscribe(self, websocket: WebSocket, topics: set[str]) -> None:
+        """Remove topics for a client."""
+        client = self._connections.get(websocket)
+        if client is not None:
+            self._remove_topics(websocket, client, topics)
+
+    def _remove_topics(
+        self, websocket: WebSocket, client: ClientConnection, topics: set[str]
+    ) -> None:
+        """Drop topics from a client and prune empty index entries."""
+        for topic in topics & client.topics:
+            client.topics.discard(topic)
+            subscribers = self._topic_index.get(topic)
+            if subscribers is not None:
+                subscribers.discard(websocket)
+                if not subscribers:
+                    del self._topic_index[topic]
+
+    async def broadcast(self, frame: Frame) -> None:
+        """Queue a frame for every connected client without waiting on sends."""
+        self._send_to(self._connections.keys(), frame)
+
+    def _send_to(self, targets: Iterable[WebSocket], frame: Frame) -> None:
+        """Queue a frame for the given clients without waiting on sends.
+
+        Clients that fell too far behind are dropped; their sockets are closed
+        in background tasks, since a close handshake on a bad link can stall.
+        """
+        slow: list[WebSocket] = []
+        for ws in targets:
+            client = self._connections.get(ws)
+            if client is not None and not client.offer(frame):
+                slow.append(ws)
+        for ws in slow:
+            logger.warning("Disconnecting slow WebSocket client")
+            WS_SLOW_DISCONNECTS.inc()
+            self.disconnect(ws)
+            task = asyncio.create_task(self._safe_close(ws))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _run_writer(self, client: ClientConnection) -> None:
+        """Run a client's writer and drop the client when its socket fails."""
+        try:
+            await client.write_loop()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if self._connections.get(client.websocket) is client:
+                self.disconnect(client.websocket)
+
+    async def _safe_close(self, websocket: WebSocket) -> None:
+        """Close a socket, ignoring errors from an already-dead connection."""
+        try:
+            await websocket.close()
+        except Exception:
+            logger.debug("WebSocket already closed")
 
     async def _subscribe(self) -> None:
-        """Listen to the Redis channel and broadcast events to clients."""
+        """Tail the Redis event stream and buffer new entries for delivery."""
+        last_id = "$"
         while True:
             try:
                 assert self._redis is not None
-                pubsub = self._redis.pubsub()
-                await pubsub.subscribe(CHANNEL)
-                logger.info("Subscribed to Redis channel %s", CHANNEL)
-                async for message in pubsub.listen():
-                    if message["type"] == "message":
-                        await self.broadcast(message["data"])
+                entries = await self._redis.xread(
+                    {EVENT_STREAM: last_id}, block=5000, count=500
+                )
+                for _stream, messages in entries:
+                    for entry_id, fields in messages:
+                        last_id = entry_id
+                        self._enqueue(entry_id, fields["event"])
             except asyncio.CancelledError:
                 break
             except Exception:
-                logger.warning("Redis subscriber error, reconnecting in 2s", exc_info=True)
+                logger.warning("Redis stream reader error, retrying in 2s", exc_info=True)
                 await asyncio.sleep(2)
 
+    def _enqueue(self, entry_id: str, message: str) -> None:
+        """Buffer an event for the next batch, collapsing exact duplicates."""
+        # Identical events in one window (e.g. repeated "metrics_update"
+        # refetch hints) carry no extra information, so keep only the newest.
+        # It moves to the end with its own ID, so events between the
+        # duplicates are never sent with an ID older than one already sent.
+        self._pending.pop(message, None)
+        self._pending[message] = entry_id
+        self._pending_event.set()
+
+    async def _flush_loop(self) -> None:
+        """Send buffered events as one frame per client every COALESCE_WINDOW."""
+        while True:
+            try:
+                await self._pending_event.wait()
+                await asyncio.sleep(COALESCE_WINDOW)
+                self._pending_event.clear()
+                pending, self._pending = list(self._pending.items()), {}
+                if pending:
+                    await self._deliver(pending)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                logger.warning("Event flush error", exc_info=True)
+
+    async def _deliver(self, pending: list[tuple[str, str]]) -> None:
+        """Send each client one frame holding only the events on its topics.
+
+        ``pending`` is a list of ``(message, stream_id)`` pairs. Every event is
+        tagged with its stream ID so clients can resume from it, and events go
+        out in stream order.
+        """
+        pending = sorted(pending, key=lambda item: stream_id_key(item[1]))
+        events = []
+        texts = []
+        for message, entry_id in pending:
+            event = json.loads(message)
+            event["id"] = entry_id
+            events.append(event)
+            # Splice the ID into the stored JSON instead of re-serializing it
+            texts.append(f'{{"id":"{entry_id}",{message[1:]}')
+
+        per_client: dict[WebSocket, list[int]] = {}
+        for index, event in enumerate(events):
+            interested: set[WebSocket] = set()
+            for topic in event_topics(event):
+                interested.update(self._topic_index.get(topic, ()))
+            for ws in interested:
+                per_client.setdefault(ws, []).append(index)
+
+        # Clients that want the same events share one encoded frame
+        groups: dict[tuple[int, ...], list[WebSocket]] = {}
+        for ws, indexes in per_client.items():
+            groups.setdefault(tuple(indexes), []).append(ws)
+        for indexes, targets in groups.items():
+            if len(indexes) == 1:
+                index = indexes[0]
+                frame = Frame(events[index], text=texts[index], event_id=events[index]["id"])
+            else:
+                batch = [events[i] for i in indexes]
+                last_id = max((event["id"] for event in batch), key=stream_id_key)
+                frame = Frame(
+                    {"type": "batch", "id": last_id, "events": batch},
+                    event_id=last_id,
+                )
+            self._send_to(targets, frame)
+
     async def _heartbeat_loop(self) -> None:
         """Send periodic pings to detect dead connections."""
         while True:
             try:
                 await asyncio.sleep(HEARTBEAT_INTERVAL)
-                ping = json.dumps({"type": "ping"})
-                stale: list[WebSocket] = []
-                for ws in list(self._connections):
-                    try:
-                        await ws.send_text(ping)
-                    except Exception:
-                        stale.append(ws)
-                for ws in stale:
-                    self._connections.discard(ws)
+                await self.broadcast(PING_FRAME)
             except asyncio.CancelledError:
                 break
             except Exception:
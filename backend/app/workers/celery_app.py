@@ -1,9 +1,34 @@
 from __future__ import annotations
 
 from celery import Celery
+from kombu import Queue
 
 from app.config import settings
 
+TASK_TIME_LIMIT = 300
+
+# Each workload class gets its own queue (and worker container) so a slow
+# Proxmox sync can never hold up latency-sensitive collection or checks.
+WORKLOAD_QUEUES: dict[str, dict[str, int]] = {
+    "sync": {"time_limit": 300, "soft_time_limit": 240},
+    "metrics": {"time_limit": 60, "soft_time_limit": 45},
+    "health": {"time_limit": 60, "soft_time_limit": 45},
+    "notifications": {"time_limit": 120, "soft_time_limit": 100},
+}
+
+TASK_QUEUES: dict[str, str] = {
+    "app.workers.sync_infrastructure.sync_infrastructure": "sync",
+    "app.workers.collect_metrics.collect_metrics": "metrics",
+    "app.workers.collect_metrics.collect_node_metrics": "metrics",
+    "app.workers.collect_metrics.publish_metrics_update": "metrics",
+    "app.workers.health_checker.health_check": "health",
+    "app.workers.dispatch_notifications.dispatch_notifications": "notifications",
+}
+
+# Beat ticks still queued after this many seconds are discarded by the worker
+# instead of running late; the next tick covers the same work.
+TICK_EXPIRES = 25
+
 celery_app = Celery(
     "nexops",
     broker=settings.celery_broker_url,
@@ -16,29 +41,54 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
-    task_track_started=True,
-    task_time_limit=300,
+    # Periodic tasks are fire-and-forget: nobody reads their results, so only
+    # tasks that opt in (chord members) write to the backend, and those expire.
+    task_ignore_result=True,
+    result_expires=3600,
+    task_time_limit=TASK_TIME_LIMIT,
     task_soft_time_limit=240,
     worker_prefetch_multiplier=1,
+    task_default_queue="default",
+    task_queues=[Queue("default")] + [Queue(name) for name in WORKLOAD_QUEUES],
+    task_routes={task: {"queue": queue} for task, queue in TASK_QUEUES.items()},
+    task_annotations={
+        task: WORKLOAD_QUEUES[queue] for task, queue in TASK_QUEUES.items()
+    },
 )
 
 celery_app.conf.beat_schedule = {
     "sync-infrastructure": {
         "task": "app.workers.sync_infrastructure.sync_infrastructure",
         "schedule": 30.0,
+        "options": {"expires": TICK_EXPIRES},
     },
     "collect-metrics": {
         "task": "app.workers.collect_metrics.collect_metrics",
         "schedule": 30.0,
+        "options": {"expires": TICK_EXPIRES},
     },
     "health-check": {
         "task": "app.workers.health_checker.health_check",
         "schedule": 30.0,
+        "options": {"expires": TICK_EXPIRES},
+    },
+    "dispatch-notifications": {
+        "task": "app.workers.dispatch_notifications.dispatch_notifications",
+        "schedule": 15.0,
+        "options": {"expires": TICK_EXPIRES},
+    },
+    "track-vm-tasks": {
+        "task": "app.workers.track_vm_tasks.track_vm_tasks",
+        "schedule": 30.0,
+        "options": {"expires": TICK_EXPIRES},
     },
 }
 
 celery_app.conf.include = [
+    "app.workers.telemetry",
     "app.workers.sync_infrastructure",
     "app.workers.collect_metrics",
     "app.workers.health_checker",
+    "app.workers.dispatch_notifications",
+    "app.workers.track_vm_tasks",
 ]
@@ -1,33 +1,99 @@
 from __future__ import annotations
 
-import asyncio
 import logging
+import uuid
+
+from celery import chord
 
 from app.workers.celery_app import celery_app
+from app.workers.runtime import run_async
+from app.workers.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
-def collect_metrics(self) -> dict[str, str]:
-    """Collect VM metrics from Proxmox every 30 seconds."""
+@celery_app.task(bind=True)
+@single_flight()
+def collect_metrics(self) -> dict[str, str | int]:
+    """Fan out VM metrics collection as one shard per node every 30 seconds.
+
+    Shards run as a chord so one slow node only delays its own shard, and the
+    join step publishes a single ``metrics_update`` once every shard is done.
+    Shards carry no expiry: an expired shard would be revoked and fail the
+    chord. If a shard does fail, the errback still publishes the update for
+    the shards that succeeded.
+    """
     try:
-        asyncio.run(_collect())
-        return {"status": "success"}
-    except Exception as exc:
+        node_ids = run_async(_get_node_ids())
+    except Exception:
         logger.exception("Metrics collection failed")
-        raise self.retry(exc=exc)
+        raise
 
+    if not node_ids:
+        return {"status": "success", "shards": 0}
 
-async def _collect() -> None:
-    """Run the async metrics collection."""
-    from app.database import async_session_maker
-    from app.services.metrics import MetricsService
+    chord(collect_node_metrics.s(str(node_id)) for node_id in node_ids)(
+        publish_metrics_update.s().on_error(publish_metrics_update_on_error.s())
+    )
+    return {"status": "dispatched", "shards": len(node_ids)}
+
+
+# Chord members must store results for the join step to run
+@celery_app.task(bind=True, ignore_result=False)
+@single_flight(key=lambda node_id: node_id)
+def collect_node_metrics(self, node_id: str) -> dict[str, str | int]:
+    """Collect metrics for the running VMs of a single node and publish them."""
     from app.websocket.events import publish_event
 
-    async with async_session_maker() as session:
-        service = MetricsService(session)
-        await service.collect_vm_metrics()
+    try:
+        batch = run_async(_collect(uuid.UUID(node_id)))
+    except Exception:
+        logger.exception("Metrics collection failed for node %s", node_id)
+        raise
+
+    # Push the new samples so dashboards append them instead of refetching
+    publish_event("metrics_samples", {"node_id": node_id, **batch})
+    return {"status": "success", "node_id": node_id, "vms": len(batch["samples"])}
+
+
+@celery_app.task
+def publish_metrics_update(results: list[dict]) -> dict[str, str | int]:
+    """Chord join: publish one update once every node shard has finished."""
+    collected = sum(
+        result.get("vms", 0) for result in results if isinstance(result, dict)
+    )
+    _publish_update()
+    return {"status": "success", "vms": collected}
+
+
+@celery_app.task
+def publish_metrics_update_on_error(request, exc, traceback) -> None:
+    """Chord errback: a shard failed, but the other nodes' samples are stored."""
+    logger.warning("Metrics shard failed, publishing the update anyway: %s", exc)
+    _publish_update()
+
+
+def _publish_update() -> None:
+    from app.websocket.events import publish_event
 
     publish_event("metrics_update")
     publish_event("alert_update")
+
+
+async def _get_node_ids() -> list[uuid.UUID]:
+    """Find the nodes that need a collection shard."""
+    from app.database import async_session_maker
+    from app.services.metrics import MetricsService
+
+    async with async_session_maker() as session:
+        return await MetricsService(session).get_collection_node_ids()
+
+
+async def _collect(node_id: uuid.UUID) -> dict:
+    """Run the async metrics collection for one node."""
+    from app.database import async_session_maker
+    from app.services.metrics import MetricsService
+
+    async with async_session_maker() as session:
+        service = MetricsService(session)
+        return await service.collect_vm_metrics(node_id)
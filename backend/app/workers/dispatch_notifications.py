@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import logging
+
+from app.workers.celery_app import celery_app
+from app.workers.runtime import run_async
+from app.workers.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_LIMITS = {"max_connections": 50, "max_keepalive_connections": 20}
+
+
+@celery_app.task(bind=True)
+@single_flight()
+def dispatch_notifications(self) -> dict[str, str | int]:
+    """Deliver queued alert notifications on the dedicated notifications queue."""
+    try:
+        delivered = run_async(_dispatch())
+        return {"status": "success", "notifications": delivered}
+    except Exception:
+        logger.exception("Notification dispatch failed")
+        raise
+
+
+async def _dispatch() -> int:
+    """Drain all pending notification channels."""
+    import httpx
+
+    from app.config import settings
+    from app.services.notifications import NotificationDispatcher
+    from app.workers.runtime import get_http_client, get_redis
+
+    client = get_http_client(
+        "notifications",
+        timeout=settings.notification_timeout,
+        limits=httpx.Limits(**HTTP_POOL_LIMITS),
+    )
+    dispatcher = NotificationDispatcher(get_redis(), client)
+    delivered = await dispatcher.dispatch_pending()
+
+    if delivered:
+        logger.info(
+            "Delivered %d notifications across %d channels",
+            sum(delivered.values()),
+            len(delivered),
+        )
+    return sum(delivered.values())
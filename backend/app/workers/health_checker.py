@@ -1,91 +1,204 @@
 from __future__ import annotations
 
 import asyncio
-import ipaddress
 import logging
-import socket
-from datetime import datetime, timezone
-from urllib.parse import urlparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
 
 import httpx
-from sqlalchemy import select
+from sqlalchemy import or_, select
 
+from app.config import settings
+from app.services.url_safety import is_url_safe
 from app.workers.celery_app import celery_app
+from app.workers.runtime import get_http_client, run_async
+from app.workers.single_flight import single_flight
+
+if TYPE_CHECKING:
+    from app.models.service import Service
 
 logger = logging.getLogger(__name__)
 
 HEALTH_CHECK_TIMEOUT = 10
 
 
-def _is_url_safe(url: str) -> bool:
-    """Check that URL does not resolve to a private, loopback, or link-local IP."""
-    parsed = urlparse(url)
-    hostname = parsed.hostname
-    if not hostname:
-        return False
-    try:
-        resolved = socket.getaddrinfo(hostname, None)
-        for _, _, _, _, sockaddr in resolved:
-            ip = ipaddress.ip_address(sockaddr[0])
-            if ip.is_private or ip.is_loopback or ip.is_link_local:
-                return False
-    except (socket.gaierror, ValueError):
-        return False
-    return True
-
-
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=30)
-def health_check(self) -> dict[str, str]:
-    """Ping health check URLs for all services every 30 seconds."""
-    try:
-        asyncio.run(_check_health())
-        return {"status": "success"}
-    except Exception as exc:
-        logger.exception("Health check failed")
-        raise self.retry(exc=exc)
+def _next_interval(service: Service) -> float:
+    """Seconds until the service's next check.
+
+    An explicit ``check_interval_seconds`` is used as-is. Otherwise the base
+    interval doubles every ``health_check_backoff_after`` consecutive checks
+    with an unchanged status, so stable services (up or down) are polled less
+    while a status change drops straight back to the base interval. Jitter only
+    shortens the interval, so a service is never pushed past its next tick.
+    """
+    if service.check_interval_seconds:
+        interval = float(service.check_interval_seconds)
+    else:
+        exponent = min(service.status_streak // settings.health_check_backoff_after, 10)
+        interval = min(
+            settings.health_check_base_interval * 2**exponent,
+            settings.health_check_max_interval,
+        )
+    return interval * random.uniform(1 - settings.health_check_jitter, 1)
 
 
-async def _check_health() -> None:
-    """Run async health checks for all services."""
+@celery_app.task(bind=True)
+@single_flight()
+def health_check(self) -> dict[str, str | int]:
+    """Ping health check URLs for all due services every 30 seconds."""
+    try:
+        checked = run_async(_check_health())
+        return {"status": "success", "services": checked}
+    except Exception:
+        logger.exception("Health check failed")
+        raise
+
+
+async def _check_service(
+    client: httpx.AsyncClient,
+    service: Service,
+    semaphore: asyncio.Semaphore,
+) -> list[tuple[str, float, str]]:
+    """Check a single service, update its status in place and return samples.
+
+    Samples are ``(metric_name, value, unit)`` tuples: ``up`` always, plus
+    ``response_time_ms``/``http_status`` when a response arrived and
+    ``error_<class>`` when the check failed.
+    """
+    # Stagger start times so a sweep's requests don't all land in the same second
+    await asyncio.sleep(random.uniform(0, settings.health_check_start_spread))
+    async with semaphore:
+        if not await is_url_safe(service.health_check_url):
+            service.status = "unhealthy"
+            logger.warning(
+                "Blocked health check for %s: URL %s resolves to private IP",
+                service.name,
+                service.health_check_url,
+            )
+            service.last_health_check = datetime.now(timezone.utc)
+            return [("up", 0.0, "bool"), ("error_blocked", 1.0, "count")]
+
+        samples: list[tuple[str, float, str]] = []
+        started = time.perf_counter()
+        try:
+            response = await client.get(service.health_check_url)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+            samples.append(("response_time_ms", elapsed_ms, "ms"))
+            samples.append(("http_status", float(response.status_code), "code"))
+            if response.status_code < 400:
+                service.status = "healthy"
+            else:
+                service.status = "unhealthy"
+                samples.append(("error_http", 1.0, "count"))
+        except httpx.TimeoutException:
+            service.status = "unhealthy"
+            samples.append(("error_timeout", 1.0, "count"))
+            logger.warning("Health check timed out for %s", service.name)
+        except httpx.ConnectError:
+            service.status = "unhealthy"
+            samples.append(("error_connect", 1.0, "count"))
+            logger.warning("Health check could not connect to %s", service.name)
+        except httpx.RequestError:
+            service.status = "unhealthy"
+            samples.append(("error_request", 1.0, "count"))
+            logger.warning("Health check failed for %s", service.name)
+
+        samples.append(("up", 1.0 if service.status == "healthy" else 0.0, "bool"))
+        service.last_health_check = datetime.now(timezone.utc)
+        return samples
+
+
+async def _check_health() -> int:
+    """Run async health checks for all services concurrently.
+
+    At most ``health_check_concurrency`` checks are in flight at once. Checks
+    still running at the sweep deadline are cancelled and leave the service
+    untouched until the next sweep. Completed checks are written as
+    ``source_type="service"`` metric samples in one bulk insert.
+
+    Only services whose ``next_health_check_at`` is due are checked; each
+    checked service is rescheduled from the sweep start via ``_next_interval``.
+    """
     from app.database import async_session_maker
     from app.models.service import Service
+    from app.services.metrics import MetricsService
+
+    sweep_started = datetime.now(timezone.utc)
 
     async with async_session_maker() as session:
         result = await session.execute(
-            select(Service).where(Service.health_check_url.is_not(None))
+            select(Service).where(
+                Service.health_check_url.is_not(None),
+                or_(
+                    Service.next_health_check_at.is_(None),
+                    Service.next_health_check_at <= sweep_started,
+                ),
+            )
         )
         services = list(result.scalars().all())
+        previous_status = {service.id: service.status for service in services}
 
-        async with httpx.AsyncClient(timeout=HEALTH_CHECK_TIMEOUT) as client:
-            for service in services:
-                if not _is_url_safe(service.health_check_url):
-                    service.status = "unhealthy"
-                    logger.warning(
-                        "Blocked health check for %s: URL %s resolves to private IP",
-                        service.name,
-                        service.health_check_url,
-                    )
-                    service.last_health_check = datetime.now(timezone.utc)
-                    continue
-
-                try:
-                    response = await client.get(service.health_check_url)
-                    if response.status_code < 400:
-                        service.status = "healthy"
-                    else:
-                        service.status = "unhealthy"
-                except httpx.TimeoutException:
-                    service.status = "unhealthy"
-                    logger.warning("Health check timed out for %s", service.name)
-                except httpx.RequestError:
-                    service.status = "unhealthy"
-                    logger.warning("Health check failed for %s", service.name)
-
-                service.last_health_check = datetime.now(timezone.utc)
-
+        semaphore = asyncio.Semaphore(settings.health_check_concurrency)
+        client = get_http_client(
+            "health_check",
+            timeout=HEALTH_CHECK_TIMEOUT,
+            limits=httpx.Limits(max_connections=settings.health_check_concurrency),
+        )
+        tasks = [
+            asyncio.create_task(_check_service(client, service, semaphore))
+            for service in services
+        ]
+        pending: set[asyncio.Task] = set()
+        if tasks:
+            _, pending = await asyncio.wait(
+                tasks, timeout=settings.health_check_sweep_deadline
+            )
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(
+                "Health check sweep deadline reached, deferred %d services",
+                len(pending),
+            )
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        checked_ids = []
+        for service, task in zip(services, tasks):
+            if task not in pending and not task.exception():
+                checked_ids.append(service.id)
+                if service.status == previous_status[service.id]:
+                    service.status_streak += 1
+                else:
+                    service.status_streak = 0
+                service.next_health_check_at = sweep_started + timedelta(
+                    seconds=_next_interval(service)
+                )
+                rows.extend(
+                    {
+                        "source_type": "service",
+                        "source_id": service.id,
+                        "metric_name": metric_name,
+                        "value": value,
+                        "unit": unit,
+                        "timestamp": now,
+                    }
+                    for metric_name, value, unit in task.result()
+                )
+
+        metrics = MetricsService(session)
+        await metrics.write_samples(rows)
+        await metrics.record_latency_percentiles(checked_ids, now)
         await session.commit()
-        logger.info("Health check complete for %d services", len(services))
+        logger.info(
+            "Health check complete for %d services",
+            len(services) - len(pending),
+        )
 
     from app.websocket.events import publish_event
 
     publish_event("service_update")
+    return len(checked_ids)
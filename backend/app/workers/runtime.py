@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+import httpx
+import redis
+from celery.signals import worker_process_init, worker_process_shutdown
+from redis.asyncio import Redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Per worker process state. Celery's prefork (or solo) pool runs one task at a
+# time per process, so a single loop can be reused for every tick and the
+# connections pooled on it (SQLAlchemy engine, Redis, httpx) stay valid.
+_loop: asyncio.AbstractEventLoop | None = None
+_redis: Redis | None = None
+# Blocking client shared by everything in the process that talks to Redis
+# synchronously (API and workers alike): events, locks, telemetry, metrics.
+_sync_redis: redis.Redis | None = None
+_http_clients: dict[str, httpx.AsyncClient] = {}
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return this process's persistent event loop, creating it on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+        logger.info("Created persistent worker event loop")
+    return _loop
+
+
+def run_async(coro: Coroutine[Any, Any, T]) -> T:
+    """Run a coroutine to completion on the persistent worker loop.
+
+    Replaces ``asyncio.run`` in Celery tasks. If the task is interrupted (for
+    example by a soft time limit) the coroutine is cancelled so it cannot
+    resume during the next tick.
+    """
+    loop = get_loop()
+    task = loop.create_task(coro)
+    try:
+        return loop.run_until_complete(task)
+    except BaseException:
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(BaseException):
+                loop.run_until_complete(task)
+        raise
+
+
+def get_redis() -> Redis:
+    """Return the shared async Redis client bound to the worker loop."""
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis
+
+
+def get_sync_redis() -> redis.Redis:
+    """Return the process's shared synchronous Redis client."""
+    global _sync_redis
+    if _sync_redis is None:
+        _sync_redis = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _sync_redis
+
+
+def get_http_client(name: str, **kwargs: Any) -> httpx.AsyncClient:
+    """Return a named, pooled httpx client, creating it with ``kwargs`` on first use."""
+    client = _http_clients.get(name)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**kwargs)
+        _http_clients[name] = client
+    return client
+
+
+async def _close_resources() -> None:
+    """Close pooled clients and database connections held by this process."""
+    global _redis
+    from app.database import all_engines
+
+    for client in _http_clients.values():
+        await client.aclose()
+    _http_clients.clear()
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+    for db_engine in all_engines():
+        await db_engine.dispose()
+
+
+@worker_process_init.connect
+def _init_worker_process(**_kwargs: Any) -> None:
+    """Drop any loop or pooled connections inherited from the parent process.
+
+    The process's engines are then rebuilt with the ``worker`` role's pool
+    size and statement timeout.
+    """
+    global _loop, _redis, _sync_redis
+    from app import database
+
+    _loop = None
+    _redis = None
+    _sync_redis = None
+    _http_clients.clear()
+    for db_engine in database.all_engines():
+        db_engine.sync_engine.dispose(close=False)
+    database.configure("worker")
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**_kwargs: Any) -> None:
+    """Close pooled connections and the loop when the worker process exits."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    try:
+        _loop.run_until_complete(_close_resources())
+    except Exception:
+        logger.warning("Failed to close worker resources cleanly", exc_info=True)
+    finally:
+        _loop.close()
+        _loop = None
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import functools
+import logging
+from collections.abc import Callable
+from typing import Any
+
+import redis
+from celery.signals import task_revoked
+
+from app.workers.runtime import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+LOCK_PREFIX = "nexops:lock:"
+TICK_COUNTS_KEY = "nexops:task_ticks"
+
+
+def _count_tick(task_name: str, outcome: str) -> None:
+    """Increment the executed/skipped/expired counter for a task."""
+    try:
+        get_sync_redis().hincrby(TICK_COUNTS_KEY, f"{task_name}:{outcome}", 1)
+    except redis.RedisError:
+        logger.debug("Failed to record %s tick for %s", outcome, task_name)
+
+
+def single_flight(
+    timeout: int | None = None,
+    key: Callable[..., str] | None = None,
+) -> Callable:
+    """Allow at most one run of a bound task at a time across all workers.
+
+    A tick that finds the task already running returns ``{"status": "skipped"}``
+    immediately instead of queueing behind it. The lock expires after
+    ``timeout`` seconds, defaulting to the task's hard time limit, so a killed
+    worker cannot hold it forever. ``key`` derives a lock suffix from the task
+    arguments so that, e.g., per-node shards only exclude runs for the same node.
+    """
+
+    def decorator(func: Callable[..., dict[str, Any]]) -> Callable[..., dict[str, Any]]:
+        @functools.wraps(func)
+        def wrapper(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
+            lock_timeout = timeout or self.time_limit or self.app.conf.task_time_limit
+            lock_name = LOCK_PREFIX + self.name
+            if key is not None:
+                lock_name = f"{lock_name}:{key(*args, **kwargs)}"
+            lock = get_sync_redis().lock(lock_name, timeout=lock_timeout, blocking=False)
+            if not lock.acquire():
+                _count_tick(self.name, "skipped")
+                logger.info("Skipping %s: previous run still in progress", self.name)
+                return {"status": "skipped"}
+
+            _count_tick(self.name, "executed")
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                try:
+                    lock.release()
+                except redis.exceptions.LockError:
+                    logger.warning("Lock for %s expired before the run finished", self.name)
+
+        return wrapper
+
+    return decorator
+
+
+@task_revoked.connect
+def _count_expired_tick(sender: Any = None, expired: bool = False, **_kwargs: Any) -> None:
+    """Count beat ticks discarded because they sat in the queue past their expiry."""
+    if expired and sender is not None:
+        _count_tick(sender.name, "expired")
@@ -1,32 +1,42 @@
 from __future__ import annotations
 
-import asyncio
 import logging
 
 from app.workers.celery_app import celery_app
+from app.workers.runtime import run_async
+from app.workers.single_flight import single_flight
 
 logger = logging.getLogger(__name__)
 
+MAX_CHANGES_PER_EVENT = 500
 
-@celery_app.task(bind=True, max_retries=3, default_retry_delay=60)
+
+@celery_app.task(bind=True)
+@single_flight()
 def sync_infrastructure(self) -> dict[str, str]:
     """Sync node and VM data from Proxmox every 5 minutes."""
     try:
-        asyncio.run(_sync())
+        run_async(_sync())
         return {"status": "success"}
-    except Exception as exc:
+    except Exception:
         logger.exception("Infrastructure sync failed")
-        raise self.retry(exc=exc)
+        raise
 
 
 async def _sync() -> None:
-    """Run the async infrastructure sync."""
+    """Run the async infrastructure sync and publish what changed."""
     from app.database import async_session_maker
     from app.services.infrastructure import InfrastructureService
     from app.websocket.events import publish_event
 
     async with async_session_maker() as session:
         service = InfrastructureService(session)
-        await service.sync_nodes_and_vms()
+        changes = await service.sync_nodes_and_vms()
 
     publish_event("infra_update")
+    if any(changes.values()):
+        if sum(len(entries) for entries in changes.values()) > MAX_CHANGES_PER_EVENT:
+            # Too large to be worth applying piecemeal; clients refetch instead
+            publish_event("vm_changes", {"truncated": True})
+        else:
+            publish_event("vm_changes", changes)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Any
+
+import redis
+from celery.signals import task_postrun, task_prerun
+
+from app.instrumentation import flush_proxmox_calls
+from app.workers.runtime import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+TASK_RUNS_STREAM = "nexops:task_runs"
+TASK_RUNS_MAXLEN = 10_000
+TASK_RUNS_PAGE_SIZE = 500  # entries read per XREVRANGE when filtering by task
+# Running count/sum of run time per task, exported as a Prometheus summary
+TASK_DURATIONS_KEY = "nexops:task_durations"
+
+_started: dict[str, float] = {}
+
+
+def record_task_run(
+    task_name: str,
+    outcome: str,
+    duration_ms: float,
+    items: dict[str, int] | None = None,
+) -> None:
+    """Append one task run to the capped telemetry stream and duration totals."""
+    fields = {
+        "task": task_name,
+        "outcome": outcome,
+        "duration_ms": f"{duration_ms:.1f}",
+    }
+    if items:
+        fields["items"] = json.dumps(items, separators=(",", ":"))
+    try:
+        pipe = get_sync_redis().pipeline(transaction=False)
+        pipe.xadd(TASK_RUNS_STREAM, fields, maxlen=TASK_RUNS_MAXLEN, approximate=True)
+        pipe.hincrby(TASK_DURATIONS_KEY, f"{task_name}:count", 1)
+        pipe.hincrbyfloat(TASK_DURATIONS_KEY, f"{task_name}:sum", duration_ms / 1000)
+        pipe.execute()
+    except redis.RedisError:
+        logger.debug("Failed to record run of %s", task_name)
+
+
+def read_task_runs(task_name: str | None = None, count: int = 100) -> list[dict[str, Any]]:
+    """Return up to ``count`` of the most recent task runs, newest first.
+
+    With ``task_name`` the stream is paged backwards until ``count`` runs of
+    that task are found, so rare tasks are not crowded out by frequent ones.
+    """
+    client = get_sync_redis()
+    if not task_name:
+        return [
+            _decode_run(entry_id, fields)
+            for entry_id, fields in client.xrevrange(TASK_RUNS_STREAM, count=count)
+        ]
+
+    runs: list[dict[str, Any]] = []
+    upper = "+"
+    while len(runs) < count:
+        page = client.xrevrange(TASK_RUNS_STREAM, max=upper, count=TASK_RUNS_PAGE_SIZE)
+        for entry_id, fields in page:
+            if fields.get("task") == task_name:
+                runs.append(_decode_run(entry_id, fields))
+                if len(runs) == count:
+                    break
+        if len(page) < TASK_RUNS_PAGE_SIZE:
+            break
+        upper = f"({page[-1][0]}"
+    return runs
+
+
+def _decode_run(entry_id: str, fields: dict[str, str]) -> dict[str, Any]:
+    """Convert a raw stream entry into a task-run dict."""
+    return {
+        "id": entry_id,
+        "finished_at": int(entry_id.split("-", 1)[0]) / 1000,
+        "task": fields.get("task"),
+        "outcome": fields.get("outcome"),
+        "duration_ms": float(fields.get("duration_ms", 0)),
+        "items": json.loads(fields["items"]) if "items" in fields else {},
+    }
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id: str | None = None, **_kwargs: Any) -> None:
+    """Remember when a task started."""
+    if task_id:
+        _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _on_task_postrun(
+    task_id: str | None = None,
+    task: Any = None,
+    retval: Any = None,
+    state: str | None = None,
+    **_kwargs: Any,
+) -> None:
+    """Record duration, outcome and item counts once a task finishes."""
+    started = _started.pop(task_id, None) if task_id else None
+    if started is None or task is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+
+    outcome = (state or "unknown").lower()
+    items: dict[str, int] = {}
+    if state == "SUCCESS" and isinstance(retval, dict):
+        outcome = str(retval.get("status", outcome))
+        items = {
+            key: value
+            for key, value in retval.items()
+            if isinstance(value, int) and not isinstance(value, bool)
+        }
+    record_task_run(task.name, outcome, duration_ms, items)
+    try:
+        flush_proxmox_calls(get_sync_redis())
+    except redis.RedisError:
+        logger.debug("Failed to flush Proxmox call timings")
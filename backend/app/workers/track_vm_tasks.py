@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import logging
+import uuid
+
+from app.workers.celery_app import celery_app
+from app.workers.runtime import run_async
+from app.workers.single_flight import single_flight
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(bind=True)
+@single_flight()
+def track_vm_tasks(self, token: str | None = None) -> dict[str, str | int]:
+    """Poll outstanding Proxmox VM tasks and publish their completion.
+
+    Reschedules itself every couple of seconds while tasks are outstanding.
+    ``token`` identifies that polling chain; a run whose chain has been
+    superseded exits. Beat ticks carry no token and only restart polling if
+    the chain was lost.
+    """
+    try:
+        finished, next_token = run_async(_track(token))
+    except Exception:
+        logger.exception("VM task tracking failed")
+        raise
+    if finished is None:
+        return {"status": "superseded"}
+    if next_token:
+        from app.services.jobs import TRACK_POLL_INTERVAL
+
+        self.apply_async(args=[next_token], countdown=TRACK_POLL_INTERVAL)
+    return {"status": "success", "tasks": finished}
+
+
+async def _track(token: str | None) -> tuple[int | None, str | None]:
+    """Record finished tasks, apply their VM status, and publish events.
+
+    Returns the number of tasks that finished (None if this run was
+    superseded) and the token for the next run, if polling should continue.
+    """
+    from sqlalchemy import update
+
+    from app.database import async_session_maker
+    from app.models.vm import VM
+    from app.services.jobs import EXPECTED_STATUS, JobTracker, job_summary
+    from app.services.proxmox import proxmox_client
+    from app.websocket.events import publish_event
+    from app.workers.runtime import get_redis
+
+    tracker = JobTracker(get_redis())
+    if not await tracker.is_current_poll(token):
+        return None, None
+    finished = await tracker.poll(proxmox_client)
+
+    if finished:
+        # Apply the resulting power state now rather than on the next sync
+        by_status: dict[str, list[uuid.UUID]] = {}
+        for entry in finished:
+            if entry["status"] == "succeeded" and entry["action"] in EXPECTED_STATUS:
+                by_status.setdefault(EXPECTED_STATUS[entry["action"]], []).append(
+                    uuid.UUID(entry["vm_id"])
+                )
+        if by_status:
+            async with async_session_maker() as session:
+                for status, vm_ids in by_status.items():
+                    await session.execute(
+                        update(VM).where(VM.id.in_(vm_ids)).values(status=status)
+                    )
+                await session.commit()
+
+        for entry in finished:
+            publish_event("vm_action_complete", {
+                "job_id": entry["job_id"],
+                "vm_id": entry["vm_id"],
+                "vmid": entry["vmid"],
+                "action": entry["action"],
+                "status": entry["status"],
+                "error": entry["error"],
+            })
+        for job_id in {entry["job_id"] for entry in finished}:
+            job = await tracker.get_job(job_id)
+            if job is not None:
+                publish_event("job_update", job_summary(job))
+
+    if await tracker.pending_count() == 0:
+        await tracker.stop_polling()
+        return len(finished), None
+    return len(finished), await tracker.schedule_poll(replace=True)
+
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+
+from app.dependencies import get_read_session, get_session
+from app.main import app
+from app.models.base import generate_uuid7
+from app.models.vm import VM
+from app.schemas.infrastructure import Meta, VMListResponse, VMResponse
+from app.services.infrastructure import InfrastructureService
+
+VM_COUNT = 5000
+REQUESTS = 20
+
+
+def make_vms(count: int) -> list[VM]:
+    node_id = generate_uuid7()
+    now = datetime.now(timezone.utc)
+    return [
+        VM(
+            id=generate_uuid7(),
+            node_id=node_id,
+            vmid=100 + i,
+            name=f"vm-{i}",
+            status="running" if i % 3 else "stopped",
+            type="qemu",
+            cpu_cores=4,
+            memory_mb=8192,
+            disk_gb=64.0,
+            ip_address=f"10.0.{i // 256}.{i % 256}",
+            os_type="l26",
+            tags=["prod", f"team-{i % 7}"],
+            config={"boot": "order=scsi0", "scsi0": "local-lvm:vm-disk-0,size=64G"},
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def no_session():
+    yield None
+
+
+def baseline_app() -> FastAPI:
+    """list_vms as it was before orjson: FastAPI re-validates and JSON-encodes the model."""
+    router = APIRouter()
+
+    @router.get("/vms", response_model=VMListResponse)
+    async def list_vms(
+        node_id: uuid.UUID | None = None,
+        session=Depends(get_session),
+    ) -> VMListResponse:
+        vms = await InfrastructureService(session).get_vms(node_id)
+        return VMListResponse(
+            data=[VMResponse.model_validate(vm) for vm in vms],
+            meta=Meta(timestamp=datetime.now(timezone.utc), total=len(vms)),
+        )
+
+    baseline = FastAPI()
+    baseline.include_router(router, prefix="/api/v1/infrastructure")
+    baseline.dependency_overrides[get_session] = no_session
+    return baseline
+
+
+async def measure(target: FastAPI) -> tuple[float, list[dict]]:
+    """Return requests/sec for list_vms on ``target`` and the VMs it returned."""
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/api/v1/infrastructure/vms")
+        assert response.status_code == 200
+
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            await client.get("/api/v1/infrastructure/vms")
+        return REQUESTS / (time.perf_counter() - started), response.json()["data"]
+
+
+@pytest.mark.benchmark
+async def test_list_vms_throughput_5k_vms(monkeypatch: pytest.MonkeyPatch) -> None:
+    vms = make_vms(VM_COUNT)
+
+    async def get_vms(self, node_id=None):
+        return vms
+
+    monkeypatch.setattr(InfrastructureService, "get_vms", get_vms)
+    monkeypatch.setitem(app.dependency_overrides, get_read_session, no_session)
+
+    before, expected = await measure(baseline_app())
+    after, data = await measure(app)
+
+    print(f"\nlist_vms with {VM_COUNT} VMs: {before:.1f} req/s before, {after:.1f} req/s after")
+    assert data == expected
+    assert len(data) == VM_COUNT
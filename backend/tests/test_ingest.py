@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.ingest import LineProtocolParser
+
+SOURCE_ID = uuid.UUID("0192d3a4-0000-7000-8000-000000000001")
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def parse(text: str, precision: str = "ns") -> LineProtocolParser:
+    parser = LineProtocolParser(precision, now=NOW)
+    parser.parse(text)
+    return parser
+
+
+def samples(parser: LineProtocolParser) -> list[tuple]:
+    """Records without their generated ids."""
+    return [record[1:] for record in parser.records]
+
+
+def test_fast_path_line() -> None:
+    parser = parse(
+        f"cpu,source_type=node,source_id={SOURCE_ID},unit=percent "
+        "usage_user=12.5,value=3 1700000000000000000"
+    )
+
+    timestamp = datetime(2023, 11, 14, 22, 13, 20, tzinfo=timezone.utc)
+    assert samples(parser) == [
+        ("node", SOURCE_ID, "cpu_usage_user", 12.5, "percent", timestamp),
+        ("node", SOURCE_ID, "cpu", 3.0, "percent", timestamp),
+    ]
+    assert parser.rejected == 0
+
+
+def test_escaped_path_line() -> None:
+    parser = parse(rf"disk\ io,source_id={SOURCE_ID},unit=by\,tes read\=bytes=5i 1700000000", "s")
+
+    [(source_type, _, metric_name, value, unit, _)] = samples(parser)
+    assert (source_type, metric_name, value, unit) == ("vm", "disk io_read=bytes", 5.0, "by,tes")
+
+
+def test_field_types() -> None:
+    parser = parse(
+        f'status,source_id={SOURCE_ID} up=t,down=FALSE,count=7i,total=9u,ratio=0.5,note="a b, c=d"'
+    )
+
+    values = {metric_name: value for _, _, metric_name, value, _, _ in samples(parser)}
+    assert values == {
+        "status_up": 1.0,
+        "status_down": 0.0,
+        "status_count": 7.0,
+        "status_total": 9.0,
+        "status_ratio": 0.5,
+    }
+    assert all(timestamp == NOW for *_, timestamp in samples(parser))
+
+
+def test_string_only_line_is_rejected() -> None:
+    parser = parse(f'status,source_id={SOURCE_ID} note="down"')
+
+    assert parser.records == []
+    assert parser.errors == ["line 1: no numeric fields"]
+
+
+def test_vmid_resolution() -> None:
+    vm_id = uuid.uuid4()
+    parser = parse("mem,vmid=101,unit=bytes used=2048i\nmem,vmid=102 used=1i")
+    assert parser.accepted == 2
+    assert parser.records == []
+
+    parser.resolve_vmids({101: vm_id})
+
+    assert samples(parser) == [("vm", vm_id, "mem_used", 2048.0, "bytes", NOW)]
+    assert parser.rejected == 1
+    assert parser.errors == ["unknown vmid 102"]
+
+
+@pytest.mark.parametrize(
+    ("line", "precision"),
+    [
+        ("v=1 99999999999999999999999999", "ns"),
+        ("v=1 99999999999999999", "s"),
+        ("v=1 -99999999999999999", "s"),
+    ],
+)
+def test_out_of_range_timestamp_rejects_only_that_line(line: str, precision: str) -> None:
+    parser = parse(f"m,source_id={SOURCE_ID} {line}\nm,source_id={SOURCE_ID} v=2", precision)
+
+    assert [value for _, _, _, value, _, _ in samples(parser)] == [2.0]
+    assert parser.rejected == 1
+    assert "out of range" in parser.errors[0]
+
+
+@pytest.mark.parametrize("raw", ["nan", "NaN", "inf", "-inf", "Infinity", "1e999"])
+def test_non_finite_value_rejects_only_that_line(raw: str) -> None:
+    parser = parse(f"m,source_id={SOURCE_ID} v={raw}\nm,source_id={SOURCE_ID} v=2")
+
+    assert [value for _, _, _, value, _, _ in samples(parser)] == [2.0]
+    assert parser.rejected == 1
+    assert "not finite" in parser.errors[0]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "bad line",
+        "m,source_id=not-a-uuid v=1",
+        f"m,source_type=pod,source_id={SOURCE_ID} v=1",
+        "m v=1",
+        f"m,source_id={SOURCE_ID} v=abc",
+        f"m,source_id={SOURCE_ID} v=1 123 extra",
+    ],
+)
+def test_malformed_lines_are_rejected(line: str) -> None:
+    parser = parse(f"{line}\n# comment\n\nm,source_id={SOURCE_ID} v=1")
+
+    assert len(parser.records) == 1
+    assert parser.rejected == 1
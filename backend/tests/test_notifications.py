@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.notifications import (
+    DEAD_LETTER_KEY,
+    PAUSED_PREFIX,
+    PENDING_CHANNELS_KEY,
+    QUEUE_PREFIX,
+    NotificationDispatcher,
+)
+
+CHANNEL = "http://hooks.test/alerts"
+
+
+class FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis = redis
+        self.calls: list[tuple[str, tuple]] = []
+
+    def incr(self, key: str) -> None:
+        self.calls.append(("incr", (key,)))
+
+    def expire(self, key: str, seconds: int) -> None:
+        self.calls.append(("expire", (key, seconds)))
+
+    async def execute(self) -> list:
+        return [await getattr(self.redis, name)(*args) for name, args in self.calls]
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio for the dispatcher."""
+
+    def __init__(self) -> None:
+        self.lists: dict[str, list[str]] = {}
+        self.sets: dict[str, set[str]] = {}
+        self.counters: dict[str, int] = {}
+        self.values: dict[str, tuple[str, int | None]] = {}
+
+    async def smembers(self, key: str) -> set[str]:
+        return set(self.sets.get(key, ()))
+
+    async def sadd(self, key: str, *members: str) -> int:
+        self.sets.setdefault(key, set()).update(members)
+        return len(members)
+
+    async def srem(self, key: str, *members: str) -> int:
+        self.sets.get(key, set()).difference_update(members)
+        return len(members)
+
+    async def llen(self, key: str) -> int:
+        return len(self.lists.get(key, ()))
+
+    async def rpush(self, key: str, *values: str) -> int:
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    async def lpush(self, key: str, *values: str) -> int:
+        items = self.lists.setdefault(key, [])
+        for value in values:
+            items.insert(0, value)
+        return len(items)
+
+    async def lpop(self, key: str, count: int) -> list[str] | None:
+        items = self.lists.get(key, [])
+        batch, self.lists[key] = items[:count], items[count:]
+        return batch or None
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> bool:
+        self.values[key] = (value, ex)
+        return True
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.values)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        return True
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+
+@pytest.fixture(autouse=True)
+def notification_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "notification_batch_size", 2)
+    monkeypatch.setattr(settings, "notification_max_retries", 3)
+    monkeypatch.setattr(settings, "notification_retry_backoff", 0.0)
+    monkeypatch.setattr(settings, "notification_rate_limit_per_minute", 30)
+    monkeypatch.setattr(settings, "notification_allowed_hosts", ["hooks.test"])
+
+
+def queue(redis: FakeRedis, count: int, channel: str = CHANNEL) -> None:
+    redis.lists[QUEUE_PREFIX + channel] = [json.dumps({"n": i}) for i in range(count)]
+    redis.sets[PENDING_CHANNELS_KEY] = {channel}
+
+
+def dispatcher(redis: FakeRedis, handler) -> NotificationDispatcher:
+    return NotificationDispatcher(redis, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+async def test_delivers_queue_in_batches() -> None:
+    redis = FakeRedis()
+    queue(redis, 5)
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    delivered = await dispatcher(redis, handler).dispatch_pending()
+
+    assert delivered == {CHANNEL: 5}
+    assert [len(body["notifications"]) for body in bodies] == [2, 2, 1]
+    assert [n["n"] for body in bodies for n in body["notifications"]] == [0, 1, 2, 3, 4]
+    assert redis.sets[PENDING_CHANNELS_KEY] == set()
+
+
+async def test_retries_server_errors() -> None:
+    redis = FakeRedis()
+    queue(redis, 1)
+    statuses = iter([503, 500, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses))
+
+    delivered = await dispatcher(redis, handler).dispatch_pending()
+
+    assert delivered == {CHANNEL: 1}
+    assert DEAD_LETTER_KEY not in redis.lists
+
+
+async def test_client_errors_are_dead_lettered_without_retry() -> None:
+    redis = FakeRedis()
+    queue(redis, 2)
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(400)
+
+    delivered = await dispatcher(redis, handler).dispatch_pending()
+
+    assert delivered == {CHANNEL: 0}
+    assert calls == 1
+    dead = [json.loads(entry) for entry in redis.lists[DEAD_LETTER_KEY]]
+    assert [entry["channel"] for entry in dead] == [CHANNEL, CHANNEL]
+
+
+async def test_rate_limit_defers_remaining_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "notification_rate_limit_per_minute", 2)
+    redis = FakeRedis()
+    queue(redis, 6)
+
+    delivered = await dispatcher(redis, lambda request: httpx.Response(200)).dispatch_pending()
+
+    assert delivered == {CHANNEL: 4}
+    assert len(redis.lists[QUEUE_PREFIX + CHANNEL]) == 2
+    assert redis.sets[PENDING_CHANNELS_KEY] == {CHANNEL}
+
+
+async def test_retries_count_against_rate_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "notification_rate_limit_per_minute", 2)
+    redis = FakeRedis()
+    queue(redis, 2)
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    delivered = await dispatcher(redis, handler).dispatch_pending()
+
+    # Two attempts use up the budget; the batch waits for the next window
+    assert delivered == {CHANNEL: 0}
+    assert calls == 2
+    assert len(redis.lists[QUEUE_PREFIX + CHANNEL]) == 2
+    assert DEAD_LETTER_KEY not in redis.lists
+
+
+@pytest.mark.parametrize(("retry_after", "pause"), [("30", 30), (None, 60)])
+async def test_too_many_requests_pauses_channel(retry_after: str | None, pause: int) -> None:
+    redis = FakeRedis()
+    queue(redis, 3)
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        headers = {"Retry-After": retry_after} if retry_after else {}
+        return httpx.Response(429, headers=headers)
+
+    delivered = await dispatcher(redis, handler).dispatch_pending()
+
+    assert delivered == {CHANNEL: 0}
+    assert calls == 1
+    assert redis.values[PAUSED_PREFIX + CHANNEL] == ("1", pause)
+    remaining = [json.loads(m)["n"] for m in redis.lists[QUEUE_PREFIX + CHANNEL]]
+    assert remaining == [0, 1, 2]
+    assert DEAD_LETTER_KEY not in redis.lists
+
+    # Nothing is sent while the channel is paused
+    await dispatcher(redis, handler).dispatch_pending()
+    assert calls == 1
+
+
+async def test_private_addresses_are_blocked() -> None:
+    channel = "http://127.0.0.1:9/alerts"
+    redis = FakeRedis()
+    queue(redis, 1, channel)
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200)
+
+    delivered = await dispatcher(redis, handler).dispatch_pending()
+
+    assert delivered == {channel: 0}
+    assert calls == 0
+    assert len(redis.lists[DEAD_LETTER_KEY]) == 1
+
+
+async def test_cancelled_delivery_requeues_batch() -> None:
+    redis = FakeRedis()
+    queue(redis, 3)
+    started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(60)
+        return httpx.Response(200)
+
+    task = asyncio.create_task(dispatcher(redis, handler).dispatch_pending())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    remaining = [json.loads(m)["n"] for m in redis.lists[QUEUE_PREFIX + CHANNEL]]
+    assert remaining == [0, 1, 2]
+    assert DEAD_LETTER_KEY not in redis.lists
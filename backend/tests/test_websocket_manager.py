@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import time
+
+import pytest
+
+from app.websocket import frames
+from app.websocket.frames import Frame
+from app.websocket.manager import MAX_DROPPED, SEND_QUEUE_SIZE, ConnectionManager
+
+
+class FakeWebSocket:
+    """Records what the manager writes; a stalled socket never completes a send or close."""
+
+    def __init__(self, stalled: bool = False) -> None:
+        self.stalled = stalled
+        self.release = asyncio.Event()
+        self.received: list[str | bytes] = []
+        self.received_at: list[float] = []
+        self.closed = False
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        await self._send(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self._send(data)
+
+    async def _send(self, data: str | bytes) -> None:
+        if self.stalled:
+            await self.release.wait()
+        self.received.append(data)
+        self.received_at.append(time.perf_counter())
+
+    async def close(self) -> None:
+        if self.stalled:
+            await self.release.wait()
+        self.closed = True
+
+
+@pytest.fixture
+async def manager():
+    manager = ConnectionManager()
+    yield manager
+    for ws in list(manager._connections):
+        manager.disconnect(ws)
+    for task in manager._closing:
+        task.cancel()
+
+
+async def connect(
+    manager: ConnectionManager, count: int, encoding: str = "json", **kwargs
+) -> list[FakeWebSocket]:
+    sockets = [FakeWebSocket(**kwargs) for _ in range(count)]
+    for ws in sockets:
+        await manager.connect(ws, encoding)
+    return sockets
+
+
+async def wait_for_delivery(sockets: list[FakeWebSocket], count: int = 1) -> None:
+    async def delivered() -> None:
+        while any(len(ws.received) < count for ws in sockets):
+            await asyncio.sleep(0)
+
+    await asyncio.wait_for(delivered(), timeout=10)
+
+
+def event(entry_id: str, event_type: str = "vm_update") -> tuple[str, str]:
+    return json.dumps({"type": event_type, "data": {}}), entry_id
+
+
+@pytest.mark.benchmark
+async def test_fan_out_latency_5k_clients(manager: ConnectionManager) -> None:
+    sockets = await connect(manager, 5000)
+
+    started = time.perf_counter()
+    await manager._deliver([event("1-0")])
+    await wait_for_delivery(sockets)
+
+    latencies = sorted((ws.received_at[0] - started) * 1000 for ws in sockets)
+    print(
+        f"\nfan-out to {len(sockets)} clients: "
+        f"p50 {statistics.median(latencies):.1f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms, "
+        f"max {latencies[-1]:.1f} ms"
+    )
+    assert latencies[-1] < 2000
+
+
+async def test_stalled_client_does_not_delay_others(manager: ConnectionManager) -> None:
+    [stalled] = await connect(manager, 1, stalled=True)
+    healthy = await connect(manager, 100)
+
+    await manager._deliver([event("1-0")])
+    await wait_for_delivery(healthy)
+    assert stalled.received == []
+
+    # Enough frames to fill the stalled client's queue and pass the drop limit
+    sent = SEND_QUEUE_SIZE + MAX_DROPPED + 1
+    for index in range(sent):
+        await asyncio.wait_for(manager._deliver([event(f"{index + 2}-0")]), timeout=1)
+        await asyncio.sleep(0)
+    await wait_for_delivery(healthy, sent + 1)
+
+    # Dropped without waiting on its close handshake, which never finishes
+    assert stalled not in manager._connections
+    assert not stalled.closed
+    assert len(manager._closing) == 1
+    assert all(ws in manager._connections for ws in healthy)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("encoding", sorted(frames.ENCODERS))
+async def test_broadcast_cpu_cost_1k_clients(
+    manager: ConnectionManager, monkeypatch: pytest.MonkeyPatch, encoding: str
+) -> None:
+    clients, rounds = 1000, 20
+    sockets = await connect(manager, clients, encoding)
+    payload = {
+        "type": "vm_changes",
+        "data": {"changed": [{"id": f"vm-{i}", "status": "running", "cpu": i / 3} for i in range(50)]},
+    }
+
+    encodes = 0
+    encode = frames.ENCODERS[encoding]
+
+    def counting_encode(frame: Frame) -> str | bytes:
+        nonlocal encodes
+        encodes += 1
+        return encode(frame)
+
+    monkeypatch.setitem(frames.ENCODERS, encoding, counting_encode)
+
+    started = time.process_time()
+    for index in range(rounds):
+        await manager.broadcast(Frame(payload))
+        await wait_for_delivery(sockets, index + 1)
+    shared = time.process_time() - started
+
+    # The same fan-out if every connection encoded its own copy
+    started = time.process_time()
+    for _ in range(rounds):
+        for _ws in sockets:
+            encode(Frame(payload))
+    per_connection = time.process_time() - started
+
+    print(
+        f"\n{encoding} to {clients} clients: {shared / rounds * 1000:.1f} ms CPU per broadcast "
+        f"(encoding per connection would add {per_connection / rounds * 1000:.1f} ms)"
+    )
+    assert encodes == rounds
+    assert all(ws.received[0] is sockets[0].received[0] for ws in sockets)
+
+
+async def test_collapsed_duplicates_keep_stream_order(manager: ConnectionManager) -> None:
+    [ws] = await connect(manager, 1)
+    duplicate, _ = event("", "metrics_update")
+    other, _ = event("", "vm_update")
+
+    manager._enqueue("1-0", duplicate)
+    manager._enqueue("2-0", other)
+    manager._enqueue("3-0", duplicate)
+    await manager._deliver(list(manager._pending.items()))
+    await wait_for_delivery([ws])
+
+    batch = json.loads(ws.received[0])
+    assert [(e["type"], e["id"]) for e in batch["events"]] == [
+        ("vm_update", "2-0"),
+        ("metrics_update", "3-0"),
+    ]
+    assert batch["id"] == "3-0"
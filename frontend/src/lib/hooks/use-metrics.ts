@@ -7,6 +7,42 @@ import type { ApiResponse, MetricTimeSeries, ResourceOverview } from "@/types";
 
 const POLL_INTERVAL = 30000;
 
+const RANGE_MS = {
+  "1h": 60 * 60 * 1000,
+  "6h": 6 * 60 * 60 * 1000,
+  "24h": 24 * 60 * 60 * 1000,
+  "7d": 7 * 24 * 60 * 60 * 1000,
+} as const;
+
+interface MetricsSamplesEvent {
+  timestamp: string;
+  metrics: string[];
+  units: string[];
+  samples: Record<string, number[]>;
+}
+
+function appendSamples(
+  series: MetricTimeSeries[],
+  event: MetricsSamplesEvent,
+  values: number[],
+  range: keyof typeof RANGE_MS
+): MetricTimeSeries[] {
+  const cutoff = Date.parse(event.timestamp) - RANGE_MS[range];
+  const next = series.map((s) => ({ ...s }));
+  event.metrics.forEach((metricName, i) => {
+    let target = next.find((s) => s.metric_name === metricName);
+    if (!target) {
+      target = { metric_name: metricName, unit: event.units[i], data: [] };
+      next.push(target);
+    }
+    target.data = [
+      ...target.data.filter((point) => Date.parse(point.timestamp) >= cutoff),
+      { value: values[i], timestamp: event.timestamp },
+    ];
+  });
+  return next;
+}
+
 export function useMetricsOverview() {
   const { connected } = useWebSocket();
   const { data, error, isLoading, mutate } = useSWR<ApiResponse<ResourceOverview>>(
@@ -32,12 +68,29 @@ export function useMetricsTimeSeries(
   range: "1h" | "6h" | "24h" | "7d" = "1h"
 ) {
   const { connected } = useWebSocket();
-  const { data, error, isLoading } = useSWR<ApiResponse<MetricTimeSeries[]>>(
+  const { data, error, isLoading, mutate } = useSWR<ApiResponse<MetricTimeSeries[]>>(
     sourceId ? `/api/v1/metrics/${sourceId}?range=${range}` : null,
     fetcher,
     { refreshInterval: connected ? 0 : POLL_INTERVAL }
   );
 
+  // New samples arrive over the WebSocket; append them instead of refetching
+  useWebSocketEvent("metrics_samples", (raw) => {
+    const event = raw as unknown as MetricsSamplesEvent;
+    if (!event.samples) {
+      // A resync (empty payload): samples may have been missed, so refetch
+      mutate();
+      return;
+    }
+    const values = event.samples[sourceId];
+    if (!values) return;
+    mutate(
+      (current) =>
+        current && { ...current, data: appendSamples(current.data, event, values, range) },
+      { revalidate: false }
+    );
+  });
+
   return {
     series: data?.data ?? [],
     isLoading,
@@ -7,6 +7,35 @@ import type { ApiResponse, VM, VMMetrics } from "@/types";
 
 const POLL_INTERVAL = 10000;
 
+// Structured VM diff published by the infrastructure sync
+interface VMChangesEvent {
+  added?: VM[];
+  removed?: { id: string; node_id: string; vmid: number }[];
+  changed?: { id: string; node_id: string; vmid: number; changes: Partial<VM>; updated_at: string }[];
+  truncated?: boolean;
+}
+
+function isApplicable(event: VMChangesEvent): boolean {
+  return !event.truncated && Array.isArray(event.added) && Array.isArray(event.removed) && Array.isArray(event.changed);
+}
+
+function applyVMChanges(vms: VM[], event: VMChangesEvent, nodeId?: string): VM[] {
+  const removed = new Set(event.removed!.map((vm) => vm.id));
+  const changed = new Map(event.changed!.map((entry) => [entry.id, entry]));
+  const next = new Map<string, VM>();
+  for (const vm of vms) {
+    if (removed.has(vm.id)) continue;
+    const entry = changed.get(vm.id);
+    next.set(vm.id, entry ? { ...vm, ...entry.changes, updated_at: entry.updated_at } : vm);
+  }
+  // Upsert by id: an event replayed after a refetch may re-add a VM we already have
+  for (const vm of event.added!) {
+    if (!nodeId || vm.node_id === nodeId) next.set(vm.id, vm);
+  }
+  // The API orders VMs by name
+  return [...next.values()].sort((a, b) => a.name.localeCompare(b.name));
+}
+
 export function useVMs(nodeId?: string) {
   const { connected } = useWebSocket();
   const params = nodeId ? `?node_id=${nodeId}` : "";
@@ -16,10 +45,26 @@ export function useVMs(nodeId?: string) {
     { revalidateOnFocus: false, refreshInterval: connected ? 0 : POLL_INTERVAL }
   );
 
-  useWebSocketEvent(["infra_update", "vm_action_complete"], () => {
+  useWebSocketEvent("vm_action_complete", () => {
     mutate();
   });
 
+  useWebSocketEvent("vm_changes", (data) => {
+    const event = data as VMChangesEvent;
+    if (!isApplicable(event)) {
+      mutate();
+      return;
+    }
+    mutate(
+      (current) => {
+        if (!current) return current;
+        const vms = applyVMChanges(current.data, event, nodeId);
+        return { ...current, data: vms, meta: { ...current.meta, total: vms.length } };
+      },
+      { revalidate: false }
+    );
+  });
+
   return {
     vms: data?.data ?? [],
     total: data?.meta?.total ?? 0,
@@ -36,10 +81,33 @@ export function useVM(vmId: string) {
     { revalidateOnFocus: false }
   );
 
-  useWebSocketEvent(["infra_update", "vm_action_complete"], () => {
+  useWebSocketEvent("vm_action_complete", () => {
     mutate();
   });
 
+  useWebSocketEvent("vm_changes", (data) => {
+    const event = data as VMChangesEvent;
+    if (!isApplicable(event)) {
+      mutate();
+      return;
+    }
+    if (event.removed!.some((vm) => vm.id === vmId)) {
+      mutate();
+      return;
+    }
+    const entry = event.changed!.find((vm) => vm.id === vmId);
+    if (entry) {
+      mutate(
+        (current) =>
+          current && {
+            ...current,
+            data: { ...current.data, ...entry.changes, updated_at: entry.updated_at },
+          },
+        { revalidate: false }
+      );
+    }
+  });
+
   return {
     vm: data?.data ?? null,
     isLoading,
@@ -13,7 +13,9 @@ import React from "react";
 
 interface WebSocketEvent {
   type: string;
+  id?: string;
   data: Record<string, unknown>;
+  events?: WebSocketEvent[];
 }
 
 interface WebSocketContextValue {
@@ -32,6 +34,13 @@ const WS_BASE = (process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000")
 const MIN_RECONNECT_DELAY = 1000;
 const MAX_RECONNECT_DELAY = 30000;
 
+// Redis stream IDs ("<ms>-<seq>") in delivery order
+function isAfter(id: string, other: string): boolean {
+  const [ms, seq] = id.split("-").map(Number);
+  const [otherMs, otherSeq] = other.split("-").map(Number);
+  return ms > otherMs || (ms === otherMs && seq > otherSeq);
+}
+
 export function WebSocketProvider({ children }: { children: ReactNode }) {
   const [connected, setConnected] = useState(false);
   const listenersRef = useRef<Map<string, Set<(data: Record<string, unknown>) => void>>>(new Map());
@@ -39,16 +48,26 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
   const reconnectDelay = useRef(MIN_RECONNECT_DELAY);
   const reconnectTimer = useRef<ReturnType<typeof setTimeout> | null>(null);
   const unmounted = useRef(false);
+  const lastEventIdRef = useRef<string | null>(null);
 
   const connect = useCallback(() => {
     if (unmounted.current) return;
     if (wsRef.current?.readyState === WebSocket.OPEN) return;
 
-    const ws = new WebSocket(`${WS_BASE}/ws`);
+    // Resume from the last event seen so nothing is missed across reconnects
+    const resume = lastEventIdRef.current
+      ? `?last_event_id=${encodeURIComponent(lastEventIdRef.current)}`
+      : "";
+    const ws = new WebSocket(`${WS_BASE}/ws${resume}`);
 
     ws.onopen = () => {
       setConnected(true);
       reconnectDelay.current = MIN_RECONNECT_DELAY;
+      // Only receive event types this page is listening for
+      const topics = Array.from(listenersRef.current.keys());
+      if (topics.length > 0) {
+        ws.send(JSON.stringify({ action: "subscribe", topics }));
+      }
     };
 
     ws.onmessage = (event) => {
@@ -58,10 +77,27 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
           ws.send("pong");
           return;
         }
-        const handlers = listenersRef.current.get(msg.type);
-        if (handlers) {
-          handlers.forEach((handler) => handler(msg.data));
+        if (msg.type === "resync") {
+          // Missed events are gone; have every listener refetch from scratch
+          lastEventIdRef.current = null;
+          listenersRef.current.forEach((handlers) =>
+            handlers.forEach((handler) => handler({}))
+          );
+          return;
         }
+        // The server coalesces bursts into a single "batch" frame
+        const events = msg.type === "batch" ? msg.events ?? [] : [msg];
+        events.forEach((evt) => {
+          if (evt.id) {
+            const last = lastEventIdRef.current;
+            if (last && !isAfter(evt.id, last)) return;
+            lastEventIdRef.current = evt.id;
+          }
+          const handlers = listenersRef.current.get(evt.type);
+          if (handlers) {
+            handlers.forEach((handler) => handler(evt.data));
+          }
+        });
       } catch {
         // ignore malformed messages
       }
@@ -98,17 +134,33 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
     };
   }, [connect]);
 
+  const sendControl = useCallback(
+    (action: "subscribe" | "unsubscribe", topic: string) => {
+      const ws = wsRef.current;
+      if (ws?.readyState === WebSocket.OPEN) {
+        ws.send(JSON.stringify({ action, topics: [topic] }));
+      }
+    },
+    []
+  );
+
   const subscribe = useCallback(
     (eventType: string, handler: (data: Record<string, unknown>) => void) => {
       if (!listenersRef.current.has(eventType)) {
         listenersRef.current.set(eventType, new Set());
+        sendControl("subscribe", eventType);
       }
       listenersRef.current.get(eventType)!.add(handler);
       return () => {
-        listenersRef.current.get(eventType)?.delete(handler);
+        const handlers = listenersRef.current.get(eventType);
+        handlers?.delete(handler);
+        if (handlers && handlers.size === 0) {
+          listenersRef.current.delete(eventType);
+          sendControl("unsubscribe", eventType);
+        }
       };
     },
-    []
+    [sendControl]
   );
 
   return React.createElement(